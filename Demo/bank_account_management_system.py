@@ -1,9 +1,54 @@
+import json
+import os
+import threading
+from array import array
+from contextlib import contextmanager
+from group_commit import GroupCommitLog, read_records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class Account:
+    account_type = "basic"
+    _interest_rate = 0.0
+
     def __init__(self,account_number,holder_name,balance = 0):
         self.account_number = account_number
         self.holder_name = holder_name
+        self._columns = None
+        self._slot = None
         self.balance = balance
 
+    # While an account is attached to a BalanceColumns store, its balance and
+    # interest rate live in the store's arrays rather than on the object.
+    @property
+    def balance(self):
+        if self._columns is None:
+            return self._balance
+        return self._columns.balances[self._slot]
+
+    @balance.setter
+    def balance(self,value):
+        if self._columns is None:
+            self._balance = value
+        else:
+            self._columns.balances[self._slot] = value
+
+    @property
+    def interest_rate(self):
+        if self._columns is None:
+            return self._interest_rate
+        return self._columns.rates[self._slot]
+
+    @interest_rate.setter
+    def interest_rate(self,value):
+        if self._columns is None:
+            self._interest_rate = value
+        else:
+            self._columns.rates[self._slot] = value
+
     def deposit(self,amount):
             if amount > 0:
                 self.balance += amount
@@ -26,6 +71,8 @@ class Account:
             return f"Account Number: {self.account_number} \nHolder Name: {self.holder_name}\nBalance: ${self.balance:.2f}"
 
 class SavingsAccount(Account):
+    account_type = "savings"
+
     def __init__(self,account_number,holder_name,balance = 0):
         super().__init__(account_number,holder_name,balance)
         self.interest_rate = 0.08
@@ -40,6 +87,8 @@ class SavingsAccount(Account):
         return f"{base_info}\nAccount Type: Savings \nInterest Rate: {self.interest_rate*100}%"
 
 class DepositAccount(Account):
+    account_type = "deposit"
+
     def __init__(self,account_number,holder_name,balance = 0):
         super().__init__(account_number,holder_name,balance)
         self.interest_rate = 0.07
@@ -53,54 +102,458 @@ class DepositAccount(Account):
         base_info = super().display_info()
         return f"{base_info}\nAccount Type: Deposit \nInterest Rate: {self.interest_rate*100}%"
 
-class Bank:
+class BalanceColumns:
+    # Balances and rates of one account type stored as contiguous float64
+    # arrays. Closed accounts leave a zero-rate hole that the next open reuses,
+    # so no other account ever changes slot.
     def __init__(self):
-        self.accounts =[]
+        self.balances = array("d")
+        self.rates = array("d")
+        self.accounts = []
+        self.free_slots = []
+
+    def attach(self,account):
+        balance = account.balance
+        rate = account.interest_rate
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.balances[slot] = balance
+            self.rates[slot] = rate
+            self.accounts[slot] = account
+        else:
+            slot = len(self.accounts)
+            self.balances.append(balance)
+            self.rates.append(rate)
+            self.accounts.append(account)
+        account._columns = self
+        account._slot = slot
+
+    def detach(self,account):
+        slot = account._slot
+        balance = self.balances[slot]
+        rate = self.rates[slot]
+        account._columns = None
+        account._slot = None
+        account.balance = balance
+        account.interest_rate = rate
+        self.balances[slot] = 0.0
+        self.rates[slot] = 0.0
+        self.accounts[slot] = None
+        self.free_slots.append(slot)
+
+    def apply_interest(self):
+        if np is not None:
+            balances = np.frombuffer(self.balances,dtype=np.float64)
+            interest = balances * np.frombuffer(self.rates,dtype=np.float64)
+            balances += interest
+            return float(interest.sum())
+
+        total = 0.0
+        balances = self.balances
+        rates = self.rates
+        for slot in range(len(balances)):
+            interest = balances[slot] * rates[slot]
+            balances[slot] += interest
+            total += interest
+        return total
+
+class BalanceStore:
+    def __init__(self):
+        self.columns = {}
+        self.lock = threading.Lock()
+
+    def attach(self,account):
+        with self.lock:
+            columns = self.columns.get(account.account_type)
+            if columns is None:
+                columns = self.columns[account.account_type] = BalanceColumns()
+            columns.attach(account)
+
+    def detach(self,account):
+        with self.lock:
+            if account._columns is not None:
+                account._columns.detach(account)
+
+    def apply_interest(self,account_types=("savings","deposit")):
+        return {account_type: self.columns[account_type].apply_interest()
+                for account_type in account_types if account_type in self.columns}
+
+class AccountRegistry:
+    # Accounts keyed by account number, with secondary indexes by holder name
+    # and account type so every lookup is a dict hit instead of a list scan.
+    def __init__(self):
+        self.by_number = {}
+        self.by_holder = {}
+        self.by_type = {}
+        self.lock = threading.Lock()
+
+    def add(self,account):
+        with self.lock:
+            if account.account_number in self.by_number:
+                return False
+            self.by_number[account.account_number] = account
+            self.by_holder.setdefault(account.holder_name,{})[account.account_number] = account
+            self.by_type.setdefault(account.account_type,{})[account.account_number] = account
+            return True
+
+    def remove(self,account_number):
+        with self.lock:
+            account = self.by_number.pop(account_number,None)
+            if account:
+                self.__unindex(self.by_holder,account.holder_name,account_number)
+                self.__unindex(self.by_type,account.account_type,account_number)
+            return account
+
+    def __unindex(self,index,key,account_number):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(account_number,None)
+            if not bucket:
+                del index[key]
+
+    def get(self,account_number):
+        return self.by_number.get(account_number)
+
+    def find_by_holder(self,holder_name):
+        return list(self.by_holder.get(holder_name,{}).values())
+
+    def find_by_type(self,account_type):
+        return list(self.by_type.get(account_type.lower(),{}).values())
+
+    # Accepts an account number or an account object, matched by identity.
+    def __contains__(self,key):
+        if isinstance(key,Account):
+            return self.by_number.get(key.account_number) is key
+        return key in self.by_number
+
+    def __iter__(self):
+        return iter(self.by_number.values())
+
+    def __len__(self):
+        return len(self.by_number)
+
+class TransactionJournal:
+    # Append-only JSON-lines journal on a GroupCommitLog (see there for the
+    # append/wait protocol). Every snapshot_every records the account state
+    # is written to the snapshot file and the journal starts over.
+    def __init__(self,journal_path,snapshot_path,sequence=0,snapshot_every=100_000):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.sequence = sequence
+        self.snapshot_every = snapshot_every
+        self.records_since_snapshot = 0
+        self.log = GroupCommitLog(journal_path)
+        self.lock = threading.Lock()
+
+    def append(self,op,**fields):
+        with self.lock:
+            self.sequence += 1
+            fields["seq"] = self.sequence
+            fields["op"] = op
+            self.records_since_snapshot += 1
+            return self.log.append(json.dumps(fields))
+
+    def wait(self,ticket):
+        self.log.wait(ticket)
+
+    def commit(self):
+        self.log.commit()
+
+    def needs_snapshot(self):
+        return self.records_since_snapshot >= self.snapshot_every
+
+    def snapshot(self,accounts):
+        with self.lock:
+            self.log.commit()
+            self.__write_snapshot(accounts)
+
+    def __write_snapshot(self,accounts):
+        data = {
+            "seq": self.sequence,
+            "accounts": [{
+                "account_type": account.account_type,
+                "account_number": account.account_number,
+                "holder_name": account.holder_name,
+                "balance": account.balance
+            } for account in accounts]
+        }
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path,"w") as f:
+            json.dump(data,f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path,self.snapshot_path)
+
+        # Everything up to self.sequence is in the snapshot now. If we crash
+        # before the truncate, recovery skips those records by sequence number.
+        self.log.truncate()
+        self.records_since_snapshot = 0
+
+    def close(self):
+        with self.lock:
+            self.log.close()
+
+def recover_bank(journal_path,snapshot_path,**journal_options):
+    bank = Bank()
+    sequence = 0
+
+    try:
+        with open(snapshot_path,"r") as f:
+            data = json.load(f)
+        for a_data in data["accounts"]:
+            bank.open_account(a_data["account_type"],a_data["account_number"],a_data["holder_name"],a_data["balance"])
+        sequence = data["seq"]
+    except FileNotFoundError:
+        pass
+
+    for record in read_records(journal_path):
+        if record["seq"] > sequence:
+            bank.apply_record(record)
+            sequence = record["seq"]
+
+    bank.journal = TransactionJournal(journal_path,snapshot_path,sequence,**journal_options)
+    return bank
+
+class LockStripes:
+    # A fixed pool of locks shared by all accounts. Each account number hashes
+    # to one stripe; operations take their stripes in ascending index order, so
+    # two transfers can never wait on each other in a cycle.
+    def __init__(self,stripes=256):
+        self.locks = [threading.Lock() for _ in range(stripes)]
+
+    def stripe(self,key):
+        return hash(key) % len(self.locks)
+
+    # Fast path for the one- and two-account operations that dominate traffic.
+    def acquire(self,first,second=None):
+        low = self.stripe(first)
+        high = low if second is None else self.stripe(second)
+        if low > high:
+            low, high = high, low
+        self.locks[low].acquire()
+        if high != low:
+            self.locks[high].acquire()
+        return low, high
+
+    def release(self,stripes):
+        low, high = stripes
+        if high != low:
+            self.locks[high].release()
+        self.locks[low].release()
+
+    @contextmanager
+    def hold(self,*keys):
+        stripes = sorted({self.stripe(key) for key in keys})
+        for stripe in stripes:
+            self.locks[stripe].acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self.locks[stripe].release()
+
+    @contextmanager
+    def hold_all(self):
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self.locks):
+                lock.release()
+
+class Bank:
+    def __init__(self,journal=None):
+        self.accounts = AccountRegistry()
+        self.balances = BalanceStore()
+        self.locks = LockStripes()
+        self.journal = journal
+
+    # Records are appended while the caller still holds the stripes of the
+    # accounts involved, so the journal order matches the order of effects.
+    def _record(self,op,**fields):
+        if self.journal:
+            return self.journal.append(op,**fields)
+        return None
+
+    # Called once the stripes are released, so other operations can share the
+    # fsync; an operation only reports success after its record is on disk.
+    def _wait_durable(self,ticket):
+        if ticket is not None:
+            self.journal.wait(ticket)
+
+    # Snapshots need every stripe, so they are only taken once the caller has
+    # released its own.
+    def _maybe_checkpoint(self):
+        if self.journal and self.journal.needs_snapshot():
+            with self.locks.hold_all():
+                if self.journal.needs_snapshot():
+                    self.journal.snapshot(self.accounts)
+
+    def checkpoint(self):
+        with self.locks.hold_all():
+            self.journal.snapshot(self.accounts)
+
+    def apply_record(self,record):
+        op = record["op"]
+        if op == "open":
+            self.open_account(record["account_type"],record["account_number"],record["holder_name"],record["initial_deposit"])
+        elif op == "close":
+            self.close_account(record["account_number"])
+        elif op == "deposit":
+            self.deposit(record["account_number"],record["amount"])
+        elif op == "withdraw":
+            self.withdraw(record["account_number"],record["amount"])
+        elif op == "transfer":
+            self.transfer_funds(record["from_account"],record["to_account"],record["amount"])
+        elif op == "interest":
+            self.post_interest()
+        elif op == "batch":
+            with self.locks.hold(*record["net"]):
+                self.__apply_net(record["net"])
 
     def open_account(self,account_type,account_number,holder_name,initial_deposit=0):
-        if not any (acc.account_number == account_number for acc in self.accounts):
+        with self.locks.hold(account_number):
+            if account_number in self.accounts:
+                return None
             if account_type.lower() == 'savings':
                 account = SavingsAccount(account_number,holder_name,initial_deposit)
             elif account_type.lower() == "deposit":
                 account = DepositAccount(account_number,holder_name, initial_deposit)
             else:
                 return None
-            
-            self.accounts.append(account)
-            return account
-        return None
+
+            self.accounts.add(account)
+            self.balances.attach(account)
+            ticket = self._record("open",account_type=account.account_type,account_number=account_number,
+                                  holder_name=holder_name,initial_deposit=initial_deposit)
+        self._wait_durable(ticket)
+        self._maybe_checkpoint()
+        return account
 
     def close_account(self,account_number):
-        account = self.find_account(account_number)
-        if account:
-            self.accounts.remove(account)
-            return True
-        return False
+        with self.locks.hold(account_number):
+            account = self.accounts.remove(account_number)
+            if not account:
+                return False
+            self.balances.detach(account)
+            ticket = self._record("close",account_number=account_number)
+        self._wait_durable(ticket)
+        self._maybe_checkpoint()
+        return True
 
     def find_account(self,account_number):
-        for account in self.accounts:
-            if account.account_number == account_number:
-                return account
-        return None
+        return self.accounts.get(account_number)
 
-    def transfer_funds(self,from_account_num,to_account_num,amount):
-        from_account = self.find_account(from_account_num)
-        to_account = self.find_account(to_account_num)
+    def find_accounts_by_holder(self,holder_name):
+        return self.accounts.find_by_holder(holder_name)
+
+    def find_accounts_by_type(self,account_type):
+        return self.accounts.find_by_type(account_type)
+
+    def deposit(self,account_number,amount):
+        stripes = self.locks.acquire(account_number)
+        try:
+            account = self.find_account(account_number)
+            if not (account and account.deposit(amount)):
+                return False
+            ticket = self._record("deposit",account_number=account_number,amount=amount)
+        finally:
+            self.locks.release(stripes)
+        self._wait_durable(ticket)
+        self._maybe_checkpoint()
+        return True
 
-        if from_account and to_account:
-            return from_account.transfer(to_account,amount)
-        return False
+    def withdraw(self,account_number,amount):
+        stripes = self.locks.acquire(account_number)
+        try:
+            account = self.find_account(account_number)
+            if not (account and account.withdraw(amount)):
+                return False
+            ticket = self._record("withdraw",account_number=account_number,amount=amount)
+        finally:
+            self.locks.release(stripes)
+        self._wait_durable(ticket)
+        self._maybe_checkpoint()
+        return True
+
+    def transfer_funds(self,from_account_num,to_account_num,amount):
+        stripes = self.locks.acquire(from_account_num,to_account_num)
+        try:
+            from_account = self.find_account(from_account_num)
+            to_account = self.find_account(to_account_num)
+            if not (from_account and to_account and from_account.transfer(to_account,amount)):
+                return False
+            ticket = self._record("transfer",from_account=from_account_num,to_account=to_account_num,amount=amount)
+        finally:
+            self.locks.release(stripes)
+        self._wait_durable(ticket)
+        self._maybe_checkpoint()
+        return True
     
+    # Settles a whole file of (from, to, amount) transfers at once. Transfers
+    # are netted per account, funds are checked against the net movement, and
+    # either every valid transfer is applied or none is. Returns one
+    # (success, message) tuple per input transfer, in input order.
+    def transfer_batch(self,transfers):
+        transfers = list(transfers)
+        results = [None] * len(transfers)
+        # Netted in whole cents, so the sums are exact whatever the order;
+        # each account's net is converted to dollars once.
+        net_cents = {}
+        accepted = []
+        for index,(from_account_num,to_account_num,amount) in enumerate(transfers):
+            cents = round(amount * 100)
+            if not cents > 0:
+                results[index] = (False,"Invalid amount")
+                continue
+            net_cents[from_account_num] = net_cents.get(from_account_num,0) - cents
+            net_cents[to_account_num] = net_cents.get(to_account_num,0) + cents
+            accepted.append(index)
+        if not accepted:
+            return results
+        net = {number: cents / 100 for number,cents in net_cents.items()}
+
+        with self.locks.hold(*net):
+            missing = {number for number in net if number not in self.accounts}
+            short = {number for number,change in net.items()
+                     if number not in missing and self.find_account(number).balance + change < 0}
+            if missing or short:
+                for index in accepted:
+                    from_account_num, to_account_num, _ = transfers[index]
+                    if from_account_num in missing or to_account_num in missing:
+                        results[index] = (False,"Account not found")
+                    elif from_account_num in short:
+                        results[index] = (False,"Insufficient funds")
+                    else:
+                        results[index] = (False,"Batch rejected")
+                return results
+
+            self.__apply_net(net)
+            ticket = self._record("batch",net=net)
+        self._wait_durable(ticket)
+        for index in accepted:
+            results[index] = (True,"Transferred")
+        self._maybe_checkpoint()
+        return results
+
+    def __apply_net(self,net):
+        for number,change in net.items():
+            self.find_account(number).balance += change
+
+    def post_interest(self):
+        with self.locks.hold_all():
+            totals = self.balances.apply_interest()
+            ticket = self._record("interest")
+        self._wait_durable(ticket)
+        self._maybe_checkpoint()
+        return totals
+
     def add_interest_to_savings(self):
-        total_interest =0
-        for account in self.accounts:
-            if isinstance(account,(SavingsAccount,DepositAccount)):
-                interest = account.add_interest()
-                total_interest += interest
-        return total_interest
+        return sum(self.post_interest().values())
 
 def bank_menu():
-    bank = Bank()
+    bank = recover_bank("bank_journal.log","bank_snapshot.json")
 
     while True:
         print ("\n Bank Account Management System")
@@ -137,18 +590,16 @@ def bank_menu():
         elif choice == '3':
             account_number = input("Enter account number: ")
             amount = float(input("Enter deposit amount: "))
-            account = bank.find_account(account_number)
-            if account and account.deposit(amount):
-                print(f"Deposit successful. New balance: ${account.balance:.2f}")
+            if bank.deposit(account_number, amount):
+                print(f"Deposit successful. New balance: ${bank.find_account(account_number).balance:.2f}")
             else:
                 print("Deposit failed. Account not found or invalid amount.")
 
         elif choice == '4':
             account_number = input("Enter account number: ")
             amount = float(input("Enter withdrawal amount: "))
-            account = bank.find_account(account_number)
-            if account and account.withdraw(amount):
-                print(f"Withdrawal successful. New balance: ${account.balance:.2f}")
+            if bank.withdraw(account_number, amount):
+                print(f"Withdrawal successful. New balance: ${bank.find_account(account_number).balance:.2f}")
             else:
                 print("Withdrawal failed. Account not found, insufficient funds, or invalid amount.")
 
@@ -175,6 +626,8 @@ def bank_menu():
             print(f"Interest added to all savings accounts. Total interest paid: ${total_interest:.2f}")
 
         elif choice == '8':
+            bank.checkpoint()
+            bank.journal.close()
             print("Exiting Bank System.")
             break
 
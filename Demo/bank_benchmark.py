@@ -0,0 +1,158 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from bank_account_management_system import Bank,SavingsAccount,DepositAccount,TransactionJournal
+
+def build_bank(size,balance=100.0):
+    bank = Bank()
+    for i in range(size):
+        account_type = "savings" if i % 2 == 0 else "deposit"
+        bank.open_account(account_type,f"ACC{i}",f"Holder {i % 1000}",balance)
+    return bank
+
+def timed(operations,func):
+    start = time.perf_counter()
+    for i in range(operations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    return operations / elapsed if elapsed else float("inf")
+
+def journaled_deposits(bank,numbers,operations=2_000):
+    # Deposits through a journal attached after the build, so each one waits
+    # for its record's fsync.
+    with tempfile.TemporaryDirectory() as directory:
+        bank.journal = TransactionJournal(os.path.join(directory,"journal.log"),os.path.join(directory,"snapshot.json"))
+        try:
+            return timed(min(operations,len(numbers)),lambda i: bank.deposit(numbers[i],1.0))
+        finally:
+            bank.journal.close()
+            bank.journal = None
+
+def benchmark_registry(size,operations=100_000):
+    start = time.perf_counter()
+    bank = build_bank(size)
+    build_seconds = time.perf_counter() - start
+
+    step = max(size // operations,1)
+    numbers = [f"ACC{(i * step) % size}" for i in range(operations)]
+
+    results = {
+        "size": size,
+        "open_per_sec": size / build_seconds if build_seconds else float("inf"),
+        "lookup_per_sec": timed(operations,lambda i: bank.find_account(numbers[i])),
+        "deposit_per_sec": timed(operations,lambda i: bank.deposit(numbers[i],1.0)),
+        "journaled_deposit_per_sec": journaled_deposits(bank,numbers),
+        "transfer_per_sec": timed(operations,lambda i: bank.transfer_funds(numbers[i],numbers[i - 1],1.0)),
+        "close_per_sec": timed(operations,lambda i: bank.close_account(numbers[i])),
+    }
+    return results
+
+def add_interest_per_account(bank):
+    # The original month-end loop, kept here as the reference implementation.
+    total_interest = 0
+    for account in bank.accounts:
+        if isinstance(account,(SavingsAccount,DepositAccount)):
+            total_interest += account.add_interest()
+    return total_interest
+
+def benchmark_interest(size):
+    per_account_bank = build_bank(size)
+    columnar_bank = build_bank(size)
+
+    start = time.perf_counter()
+    per_account_total = add_interest_per_account(per_account_bank)
+    per_account_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals = columnar_bank.post_interest()
+    columnar_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for account in per_account_bank.accounts
+                     if account.balance != columnar_bank.find_account(account.account_number).balance)
+    return {
+        "size": size,
+        "per_account_seconds": per_account_seconds,
+        "columnar_seconds": columnar_seconds,
+        "per_account_total": per_account_total,
+        "columnar_total": sum(totals.values()),
+        "mismatches": mismatches,
+    }
+
+def stress_transfers(thread_count,accounts=10_000,transfers_per_thread=50_000):
+    bank = Bank()
+    for i in range(accounts):
+        bank.open_account("savings",f"ACC{i}",f"Holder {i}",1000.0)
+    expected_total = sum(account.balance for account in bank.accounts)
+
+    def teller(seed):
+        rng = random.Random(seed)
+        for _ in range(transfers_per_thread):
+            bank.transfer_funds(f"ACC{rng.randrange(accounts)}",f"ACC{rng.randrange(accounts)}",float(rng.randint(1,50)))
+
+    threads = [threading.Thread(target=teller,args=(seed,)) for seed in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Whole-dollar amounts keep every balance exact, so conservation is an equality.
+    actual_total = sum(account.balance for account in bank.accounts)
+    assert actual_total == expected_total, f"money not conserved: {expected_total} -> {actual_total}"
+    assert all(account.balance >= 0 for account in bank.accounts)
+    return thread_count * transfers_per_thread / elapsed
+
+def benchmark_batch(accounts=10_000,transfers=200_000):
+    rng = random.Random(0)
+    batch = [(f"ACC{rng.randrange(accounts)}",f"ACC{rng.randrange(accounts)}",float(rng.randint(1,50)))
+             for _ in range(transfers)]
+
+    looping_bank = build_bank(accounts,10_000.0)
+    start = time.perf_counter()
+    for from_account_num,to_account_num,amount in batch:
+        looping_bank.transfer_funds(from_account_num,to_account_num,amount)
+    looping_seconds = time.perf_counter() - start
+
+    batch_bank = build_bank(accounts,10_000.0)
+    start = time.perf_counter()
+    results = batch_bank.transfer_batch(batch)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "transfers": transfers,
+        "looping_per_sec": transfers / looping_seconds,
+        "batch_per_sec": transfers / batch_seconds,
+        "applied": sum(1 for success,_ in results if success),
+    }
+
+def main(sizes):
+    print(f"{'accounts':>12} {'open/s':>12} {'lookup/s':>12} {'deposit/s':>12} {'journaled/s':>12} "
+          f"{'transfer/s':>12} {'close/s':>12}")
+    for size in sizes:
+        r = benchmark_registry(size)
+        print(f"{r['size']:>12,} {r['open_per_sec']:>12,.0f} {r['lookup_per_sec']:>12,.0f} "
+              f"{r['deposit_per_sec']:>12,.0f} {r['journaled_deposit_per_sec']:>12,.0f} "
+              f"{r['transfer_per_sec']:>12,.0f} {r['close_per_sec']:>12,.0f}")
+
+    print(f"\n{'accounts':>12} {'per-account s':>14} {'columnar s':>12} {'speedup':>8} {'total diff':>12} {'mismatches':>11}")
+    for size in sizes:
+        r = benchmark_interest(size)
+        speedup = r["per_account_seconds"] / r["columnar_seconds"] if r["columnar_seconds"] else float("inf")
+        print(f"{r['size']:>12,} {r['per_account_seconds']:>14.4f} {r['columnar_seconds']:>12.4f} {speedup:>7.1f}x "
+              f"{abs(r['per_account_total'] - r['columnar_total']):>12.2e} {r['mismatches']:>11,}")
+
+    print(f"\n{'threads':>12} {'transfers/s':>12}")
+    for thread_count in (1,2,4,8,16):
+        print(f"{thread_count:>12} {stress_transfers(thread_count):>12,.0f}")
+
+    r = benchmark_batch()
+    print(f"\n{'transfers':>12} {'looping/s':>12} {'batch/s':>12} {'applied':>12}")
+    print(f"{r['transfers']:>12,} {r['looping_per_sec']:>12,.0f} {r['batch_per_sec']:>12,.0f} {r['applied']:>12,}")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000, 10_000_000]
+    main(sizes)
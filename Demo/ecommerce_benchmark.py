@@ -0,0 +1,157 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from ecommerce_shopping import (Catalog, Product, Customer, OrderBook, OrderLog, OrderLine, UserDirectory,
+                                load_order_book)
+
+def build_catalog(products,stock):
+    return Catalog(Product(f"SKU{i}",f"Product {i}",10.0 + i % 100,stock) for i in range(products))
+
+def unlocked_checkout(catalog,items):
+    # The original two-pass checkout, kept as the reference for overselling.
+    for product_id, quantity in items.items():
+        if catalog.get(product_id).stock < quantity:
+            return False
+    for product_id, quantity in items.items():
+        catalog.get(product_id).stock -= quantity
+    return True
+
+def shopper(catalog,seed,checkouts,products,reserved):
+    rng = random.Random(seed)
+    customer = Customer(f"shopper{seed}","secret")
+    sold = {}
+    for _ in range(checkouts):
+        if reserved:
+            for _ in range(rng.randint(1,3)):
+                customer.add_to_cart(catalog,f"SKU{rng.randrange(products)}",rng.randint(1,3))
+            items = {product_id: item['quantity'] for product_id, item in customer.cart.items.items()}
+            success, _ = catalog.reservations.commit(customer.username,items)
+            customer.cart.clear_cart()
+        else:
+            items = {f"SKU{rng.randrange(products)}": rng.randint(1,3) for _ in range(rng.randint(1,3))}
+            success = unlocked_checkout(catalog,items)
+        if success:
+            for product_id, quantity in items.items():
+                sold[product_id] = sold.get(product_id,0) + quantity
+    return sold
+
+def stress_checkout(thread_count,reserved=True,products=200,stock=500,checkouts_per_thread=20_000):
+    catalog = build_catalog(products,stock)
+    results = [None] * thread_count
+
+    def run(index):
+        results[index] = shopper(catalog,index,checkouts_per_thread,products,reserved)
+
+    threads = [threading.Thread(target=run,args=(index,)) for index in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    sold = {}
+    for result in results:
+        for product_id, quantity in result.items():
+            sold[product_id] = sold.get(product_id,0) + quantity
+    # Units the shoppers were told they bought beyond what existed.
+    oversold = sum(max(0,quantity - stock) for quantity in sold.values())
+    negative = sum(1 for product in catalog if product.stock < 0)
+    lost = sum(stock - product.stock - sold.get(product.product_id,0) for product in catalog)
+    leaked = sum(catalog.reservations.reserved.values()) if reserved else 0
+    return {
+        "threads": thread_count,
+        "checkouts_per_sec": thread_count * checkouts_per_thread / elapsed,
+        "oversold": oversold,
+        "negative_stock": negative,
+        "unaccounted": lost,
+        "leaked_holds": leaked,
+    }
+
+def benchmark_orders(orders=20_000,products=1_000,customers=500):
+    rng = random.Random(0)
+    baskets = [(f"customer{rng.randrange(customers)}",
+                [OrderLine(f"SKU{p}",f"Product {p}",rng.randint(1,5),1000 + p) for p in rng.sample(range(products),3)])
+               for _ in range(orders)]
+    results = {"orders": orders}
+    with tempfile.TemporaryDirectory() as directory:
+        # Every order waits for its fsync; with several writers the waiting
+        # orders share one.
+        for name, thread_count in (("one_writer",1),("eight_writers",8)):
+            path = os.path.join(directory,f"{name}.log")
+            book = OrderBook(OrderLog(path))
+
+            def place(share):
+                for customer, lines in share:
+                    book.record(customer,lines,placed_at="2026-01-01T12:00:00")
+
+            threads = [threading.Thread(target=place,args=(baskets[i::thread_count],)) for i in range(thread_count)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            book.log.close()
+            results[f"{name}_per_sec"] = orders / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        book = load_order_book(path)
+        results["replay_seconds"] = time.perf_counter() - start
+        book.log.close()
+        start = time.perf_counter()
+        for p in range(products):
+            book.product_revenue(f"SKU{p}")
+        results["report_us"] = (time.perf_counter() - start) / products * 1e6
+        # Aggregates must agree with a full rescan of the orders.
+        rescanned = sum(line.price_cents * line.quantity for order in book.orders.values() for line in order.lines)
+        results["consistent"] = rescanned == book.total_cents == sum(book.revenue_by_day.values())
+    return results
+
+def benchmark_logins(users=20,uncached_logins=100,cached_logins=100_000):
+    # Without the cache every login pays the full password hash, so it gets
+    # far fewer attempts. The cached run includes each user's first login.
+    directory = UserDirectory(Customer(f"user{i}",f"password{i}") for i in range(users))
+    uncached = UserDirectory(directory.users.values(),max_sessions=0)
+    rng = random.Random(0)
+    results = {}
+    for name, store, logins in (("uncached",uncached,uncached_logins),("cached",directory,cached_logins)):
+        attempts = [rng.randrange(users) for _ in range(logins)]
+        start = time.perf_counter()
+        accepted = sum(1 for i in attempts if store.authenticate(f"user{i}",f"password{i}"))
+        results[f"{name}_per_sec"] = logins / (time.perf_counter() - start)
+        # A wrong password must still fail once the right one is cached.
+        rejected = sum(1 for i in attempts[:3] if store.authenticate(f"user{i}","wrong"))
+        results[f"{name}_correct"] = accepted == logins and rejected == 0
+    return results
+
+def main(thread_counts):
+    # A tiny switch interval makes threads interleave between the stock check
+    # and the decrement far more often, the way real shoppers would.
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        print(f"{'checkout':>10} {'threads':>8} {'checkouts/s':>12} {'oversold':>9} {'neg stock':>10} "
+              f"{'unaccounted':>12} {'leaked':>7}")
+        for reserved in (False,True):
+            for thread_count in thread_counts:
+                r = stress_checkout(thread_count,reserved)
+                print(f"{'reserved' if reserved else 'unlocked':>10} {r['threads']:>8} {r['checkouts_per_sec']:>12,.0f} "
+                      f"{r['oversold']:>9,} {r['negative_stock']:>10,} {r['unaccounted']:>12,} {r['leaked_holds']:>7,}")
+    finally:
+        sys.setswitchinterval(previous)
+
+    r = benchmark_orders()
+    print(f"\n{'orders':>8} {'1 writer/s':>11} {'8 writers/s':>12} {'replay s':>9} {'report us':>10} {'consistent':>11}")
+    print(f"{r['orders']:>8,} {r['one_writer_per_sec']:>11,.0f} {r['eight_writers_per_sec']:>12,.0f} "
+          f"{r['replay_seconds']:>9.2f} {r['report_us']:>10.2f} {str(r['consistent']):>11}")
+
+    r = benchmark_logins()
+    print(f"\n{'uncached logins/s':>18} {'cached logins/s':>16} {'correct':>8}")
+    print(f"{r['uncached_per_sec']:>18,.1f} {r['cached_per_sec']:>16,.0f} {str(r['uncached_correct'] and r['cached_correct']):>8}")
+
+if __name__ == "__main__":
+    thread_counts = [int(arg) for arg in sys.argv[1:]] or [1, 2, 4, 8, 16]
+    main(thread_counts)
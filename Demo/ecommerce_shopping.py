@@ -1,3 +1,20 @@
+import hashlib
+import heapq
+import hmac
+import json
+import math
+import os
+import secrets
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from group_commit import GroupCommitLog, read_records
+from id_generator import new_id
+
 class Product:
     def __init__(self,product_id,name,price,stock):
         self.product_id = product_id
@@ -8,28 +25,411 @@ class Product:
     def __str__(self):
         return f"{self.name} (ID: {self.product_id}) - ${self.price:.2f} - {self.stock} in stock"
 
+# The first string after every string that starts with prefix, or None if
+# there is none. A sentinel such as prefix + "\uffff" would sort below names
+# continuing with an astral character, e.g. an emoji.
+def prefix_end(prefix):
+    while prefix and prefix[-1] == chr(sys.maxunicode):
+        prefix = prefix[:-1]
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else None
+
+class Catalog:
+    # Products by id, plus price and name indexes kept as sorted
+    # (key, product_id) lists, so a price range or a name prefix is two
+    # bisects and a slice. Names are indexed lower-cased.
+    def __init__(self,products=()):
+        self.by_id = {}
+        self.by_price = []
+        self.by_name = []
+        for product in products:
+            if product.product_id not in self.by_id:
+                self.by_id[product.product_id] = product
+                self.by_price.append((product.price,product.product_id))
+                self.by_name.append((product.name.lower(),product.product_id))
+        self.by_price.sort()
+        self.by_name.sort()
+        self.reservations = StockReservations(self)
+
+    def add(self,product):
+        if product.product_id in self.by_id:
+            return False
+        self.by_id[product.product_id] = product
+        insort(self.by_price,(product.price,product.product_id))
+        insort(self.by_name,(product.name.lower(),product.product_id))
+        return True
+
+    def remove(self,product_id):
+        product = self.by_id.pop(product_id,None)
+        if product:
+            self.__unindex(product)
+        return product
+
+    def get(self,product_id):
+        return self.by_id.get(product_id)
+
+    # Stock changes do not touch the indexes; a new name or price moves the
+    # product's entries.
+    def update(self,product_id,name=None,price=None,stock=None):
+        product = self.by_id.get(product_id)
+        if not product:
+            return False
+        if name is not None or price is not None:
+            self.__unindex(product)
+            if name is not None:
+                product.name = name
+            if price is not None:
+                product.price = float(price)
+            insort(self.by_price,(product.price,product.product_id))
+            insort(self.by_name,(product.name.lower(),product.product_id))
+        if stock is not None:
+            return self.reservations.set_stock(product_id,stock)[0]
+        return True
+
+    def __unindex(self,product):
+        del self.by_price[bisect_left(self.by_price,(product.price,product.product_id))]
+        del self.by_name[bisect_left(self.by_name,(product.name.lower(),product.product_id))]
+
+    def price_range(self,low=None,high=None,offset=0,limit=None):
+        lo = 0 if low is None else bisect_left(self.by_price,(float(low),))
+        hi = len(self.by_price) if high is None else bisect_left(self.by_price,(math.nextafter(float(high),math.inf),))
+        first = lo + offset
+        last = hi if limit is None else min(hi,first + limit)
+        return [self.by_id[product_id] for _, product_id in self.by_price[first:last]]
+
+    def name_prefix(self,prefix,offset=0,limit=None):
+        prefix = prefix.lower()
+        lo = bisect_left(self.by_name,(prefix,))
+        end = prefix_end(prefix)
+        hi = len(self.by_name) if end is None else bisect_left(self.by_name,(end,))
+        first = lo + offset
+        last = hi if limit is None else min(hi,first + limit)
+        return [self.by_id[product_id] for _, product_id in self.by_name[first:last]]
+
+    # A name prefix narrows first when given; the price bounds then filter it.
+    def search(self,prefix=None,low=None,high=None,limit=None):
+        if not prefix:
+            return self.price_range(low,high,limit=limit)
+        results = []
+        for product in self.name_prefix(prefix):
+            if (low is None or product.price >= float(low)) and (high is None or product.price <= float(high)):
+                results.append(product)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self,product_id):
+        return product_id in self.by_id
+
+class CartHold:
+    def __init__(self,owner,expires):
+        self.owner = owner
+        self.items = {}
+        self.expires = expires
+
+class StockReservations:
+    # Stock set aside for carts. A product's units are either sold (taken off
+    # product.stock), held by a cart (counted in reserved) or available.
+    # Each product has its own lock and a multi-product operation takes its
+    # locks in product id order, so checkouts of different products never
+    # wait on each other and can never deadlock. self.lock only guards the
+    # hold bookkeeping and is always taken last.
+    def __init__(self,catalog,hold_seconds=15 * 60,clock=time.monotonic):
+        self.catalog = catalog
+        self.hold_seconds = hold_seconds
+        self.clock = clock
+        self.reserved = {}
+        self.holds = {}
+        self.expiries = []
+        self.product_locks = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def locked(self,product_ids):
+        locks = []
+        for product_id in sorted(product_ids):
+            lock = self.product_locks.get(product_id) or self.product_locks.setdefault(product_id,threading.Lock())
+            lock.acquire()
+            locks.append(lock)
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def available(self,product_id):
+        self.release_expired()
+        product = self.catalog.get(product_id)
+        return product.stock - self.reserved.get(product_id,0) if product else 0
+
+    def hold(self,owner,product_id,quantity):
+        self.release_expired()
+        with self.locked([product_id]):
+            product = self.catalog.get(product_id)
+            if not product or quantity <= 0 or product.stock - self.reserved.get(product_id,0) < quantity:
+                return False
+            with self.lock:
+                hold = self.holds.get(owner)
+                if hold is None:
+                    hold = self.holds[owner] = CartHold(owner,0)
+                hold.items[product_id] = hold.items.get(product_id,0) + quantity
+                # Any cart activity restarts the whole cart's hold.
+                hold.expires = self.clock() + self.hold_seconds
+                heapq.heappush(self.expiries,(hold.expires,owner))
+            self.reserved[product_id] = self.reserved.get(product_id,0) + quantity
+        return True
+
+    def unhold(self,owner,product_id):
+        with self.locked([product_id]):
+            with self.lock:
+                hold = self.holds.get(owner)
+                quantity = hold.items.pop(product_id,0) if hold else 0
+                if hold and not hold.items:
+                    del self.holds[owner]
+            if quantity:
+                self.reserved[product_id] -= quantity
+        return quantity
+
+    def release(self,owner,expires=None):
+        # expires, when given, only releases the hold if it was not renewed.
+        while True:
+            with self.lock:
+                hold = self.holds.get(owner)
+                if hold is None or (expires is not None and hold.expires != expires):
+                    return False
+                product_ids = list(hold.items)
+            with self.locked(product_ids):
+                with self.lock:
+                    hold = self.holds.get(owner)
+                    if hold is None or (expires is not None and hold.expires != expires):
+                        return False
+                    if not hold.items.keys() <= set(product_ids):
+                        continue  # a product was added meanwhile; lock it too
+                    del self.holds[owner]
+                for product_id, quantity in hold.items.items():
+                    self.reserved[product_id] -= quantity
+                return True
+
+    # Stock changes go through here, under the product's lock, so they cannot
+    # interleave with a checkout's stock -= quantity. Stock may not drop below
+    # the units already held by carts, or those holds could never be sold.
+    def set_stock(self,product_id,stock):
+        try:
+            stock = int(stock)
+        except ValueError:
+            return False, "Stock must be a whole number."
+        self.release_expired()
+        with self.locked([product_id]):
+            product = self.catalog.get(product_id)
+            if not product:
+                return False, "Product not found."
+            reserved = self.reserved.get(product_id,0)
+            if stock < reserved:
+                return False, f"{reserved} units of {product.name} are held in carts; stock cannot go below that."
+            product.stock = stock
+        return True, "Stock updated successfully!"
+
+    def release_expired(self):
+        expired = []
+        with self.lock:
+            now = self.clock()
+            while self.expiries and self.expiries[0][0] <= now:
+                expired.append(heapq.heappop(self.expiries))
+        # Entries left behind by renewed holds fail the expires check.
+        return sum(1 for expires, owner in expired if self.release(owner,expires))
+
+    def commit(self,owner,items):
+        # Sells items ({product_id: quantity}) all-or-nothing. Units the
+        # owner holds are used first; if the hold expired, the purchase still
+        # goes through as long as enough stock is available right now.
+        self.release_expired()
+        with self.locked(items):
+            with self.lock:
+                hold = self.holds.get(owner)
+                held = hold.items if hold else {}
+                for product_id, quantity in items.items():
+                    product = self.catalog.get(product_id)
+                    from_hold = min(held.get(product_id,0),quantity)
+                    if not product or product.stock - self.reserved.get(product_id,0) < quantity - from_hold:
+                        name = product.name if product else product_id
+                        return False, f"Sorry, {name} doesn't have enough stock."
+                for product_id, quantity in items.items():
+                    from_hold = min(held.get(product_id,0),quantity)
+                    self.catalog.get(product_id).stock -= quantity
+                    if from_hold:
+                        self.reserved[product_id] -= from_hold
+                        held[product_id] -= from_hold
+                        if not held[product_id]:
+                            del held[product_id]
+                if hold and not held:
+                    del self.holds[owner]
+        self.release(owner)
+        return True, "Order placed."
+
+# Orders are immutable once placed. Amounts are whole cents; placed_at is an
+# ISO timestamp whose first ten characters are the order's day.
+OrderLine = namedtuple("OrderLine","product_id name quantity price_cents")
+Order = namedtuple("Order","order_id customer placed_at lines total_cents")
+
+def order_to_json(order):
+    data = order._asdict()
+    data["lines"] = [line._asdict() for line in order.lines]
+    return json.dumps(data)
+
+def order_from_json(text):
+    data = json.loads(text)
+    data["lines"] = tuple(OrderLine(**line) for line in data["lines"])
+    return Order(**data)
+
+class OrderLog(GroupCommitLog):
+    # Append-only JSON-lines file of placed orders; see GroupCommitLog.
+    def append(self,order):
+        return super().append(order_to_json(order))
+
+def read_orders(path):
+    return read_records(path,order_from_json)
+
+class OrderBook:
+    # Every placed order plus sales aggregates that are updated as each order
+    # is recorded, so a report is a dict read rather than a rescan.
+    def __init__(self,log=None):
+        self.log = log
+        self.orders = {}
+        self.orders_by_customer = {}
+        self.revenue_by_product = {}
+        self.units_by_product = {}
+        self.revenue_by_customer = {}
+        self.revenue_by_day = {}
+        self.total_cents = 0
+        self.lock = threading.Lock()
+
+    def record(self,customer,lines,placed_at=None):
+        lines = tuple(lines)
+        order = Order(new_id("ORD-"),customer,placed_at or datetime.now().isoformat(timespec="seconds"),lines,
+                      sum(line.price_cents * line.quantity for line in lines))
+        # The order only counts as placed once it is on disk.
+        if self.log:
+            self.log.wait(self.log.append(order))
+        self.apply(order)
+        return order
+
+    def apply(self,order):
+        with self.lock:
+            self.orders[order.order_id] = order
+            self.orders_by_customer.setdefault(order.customer,[]).append(order.order_id)
+            for line in order.lines:
+                amount = line.price_cents * line.quantity
+                self.revenue_by_product[line.product_id] = self.revenue_by_product.get(line.product_id,0) + amount
+                self.units_by_product[line.product_id] = self.units_by_product.get(line.product_id,0) + line.quantity
+            self.revenue_by_customer[order.customer] = self.revenue_by_customer.get(order.customer,0) + order.total_cents
+            day = order.placed_at[:10]
+            self.revenue_by_day[day] = self.revenue_by_day.get(day,0) + order.total_cents
+            self.total_cents += order.total_cents
+
+    def product_revenue(self,product_id):
+        return self.revenue_by_product.get(product_id,0) / 100
+
+    def customer_revenue(self,customer):
+        return self.revenue_by_customer.get(customer,0) / 100
+
+    def day_revenue(self,day):
+        return self.revenue_by_day.get(day,0) / 100
+
+    def total_revenue(self):
+        return self.total_cents / 100
+
+def load_order_book(path):
+    book = OrderBook()
+    for order in read_orders(path):
+        book.apply(order)
+    book.log = OrderLog(path)
+    return book
+
+# PBKDF2-HMAC-SHA256 with a per-user random salt. The iteration count is
+# stored with each hash so it can be raised later without breaking old ones.
+HASH_ITERATIONS = 200_000
+
+def hash_password(password,salt,iterations=HASH_ITERATIONS):
+    return hashlib.pbkdf2_hmac("sha256",password.encode(),salt,iterations)
+
 class User:
     def __init__(self,username,password):
         self.username = username
-        self.password = password
+        self.salt = os.urandom(16)
+        self.iterations = HASH_ITERATIONS
+        self.password_hash = hash_password(password,self.salt,self.iterations)
+
+    def check_password(self,password):
+        return hmac.compare_digest(hash_password(password,self.salt,self.iterations),self.password_hash)
 
 class Admin(User):
     def __init__(self,username,password):
         super().__init__(username,password)
         self.role = "admin"
 
-    def add_product(self,products,prodcut_id,name,price,stock):
-        if not any(p.product_id == prodcut_id for p in products):
-            products.append(Product(prodcut_id,name,float(price),int(stock)))
-            return True
-        return False
+    def add_product(self,catalog,prodcut_id,name,price,stock):
+        if prodcut_id in catalog:
+            return False
+        return catalog.add(Product(prodcut_id,name,float(price),int(stock)))
+
+    def update_product(self,catalog,product_id,new_stock):
+        return catalog.reservations.set_stock(product_id,new_stock)
+
+class UserDirectory:
+    # Users by username. A successful login is remembered for session_seconds
+    # as an HMAC of the credentials under a key that only lives in this
+    # process, so repeating the same login skips the slow hash while nothing
+    # reusable offline is kept. At most max_sessions logins are remembered,
+    # least recently used first out.
+    def __init__(self,users=(),session_seconds=15 * 60,max_sessions=1024,clock=time.monotonic):
+        self.users = {}
+        self.sessions = OrderedDict()
+        self.session_seconds = session_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self.session_key = secrets.token_bytes(32)
+        self.lock = threading.Lock()
+        for user in users:
+            self.add(user)
+
+    def add(self,user):
+        if user.username in self.users:
+            return False
+        self.users[user.username] = user
+        return True
 
-    def update_product(self,products,product_id,new_stock):
-        for product in products:
-            if product.product_id == product_id:
-                product.stock = int(new_stock)
-                return True
-        return False
+    def get(self,username):
+        return self.users.get(username)
+
+    def authenticate(self,username,password,role=User):
+        user = self.users.get(username)
+        if not isinstance(user,role):
+            return None
+        digest = hmac.new(self.session_key,f"{username}\0{password}".encode(),hashlib.sha256).digest()
+        now = self.clock()
+        with self.lock:
+            session = self.sessions.get(username)
+            if session and session[1] > now and hmac.compare_digest(session[0],digest):
+                self.sessions.move_to_end(username)
+                return user
+        if not user.check_password(password):
+            return None
+        if self.max_sessions:
+            with self.lock:
+                self.sessions[username] = (digest,now + self.session_seconds)
+                self.sessions.move_to_end(username)
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+        return user
+
+    def end_session(self,username):
+        with self.lock:
+            return self.sessions.pop(username,None) is not None
 
 class Customer(User):
     def __init__(self,username,password):
@@ -37,97 +437,107 @@ class Customer(User):
         self.role = "customer"
         self.cart = ShoppingCart()
 
-    def add_to_cart(self,products,product_id,quantity):
-        product = next((p for p in products if p.product_id == product_id and p.stock >=quantity),None)
-        if product:
-            self.cart.add_item(product,quantity)
+    def add_to_cart(self,catalog,product_id,quantity):
+        if catalog.reservations.hold(self.username,product_id,quantity):
+            self.cart.add_item(catalog.get(product_id),quantity)
             return True
         return False
     
-    def remove_from_cart(self,product_id):
+    def remove_from_cart(self,catalog,product_id):
+        catalog.reservations.unhold(self.username,product_id)
         return self.cart.remove_item(product_id)
     
     def view_cart(self):
         return self.cart.view_cart()
     
-    def checkout(self,products):
-        total = self.cart.view_cart()
-        if total == 0:
-            return 0
+    def checkout(self,catalog,orders=None):
+        if not self.cart.items:
+            return 0, "Your cart is  empty."
         
-        for item in self.cart.get_items():
-            if item['product'].stock < item['quantity']:
-                print(f"Sorry, {item['product'].name} doesn't have enough stock.")
-                return 0
-            
-        for item in self.cart.get_items():
-            item['product'].stock -= item['quantity']
-
+        items = {product_id: item['quantity'] for product_id, item in self.cart.items.items()}
+        success, message = catalog.reservations.commit(self.username,items)
+        if not success:
+            return 0, message
+
+        if orders is not None:
+            order = orders.record(self.username,(OrderLine(product_id,item['product'].name,item['quantity'],item['price_cents'])
+                                                 for product_id, item in self.cart.items.items()))
+            message = f"Order {order.order_id} placed."
         total = self.cart.calculate_total()
         self.cart.clear_cart()
-        return total
+        return total, message
     
+def to_cents(amount):
+    return int(round(amount * 100))
+
 class ShoppingCart:
+    # Lines keyed by product id. Each line keeps the unit price it was added
+    # at, and the cart keeps its unit count and total (in whole cents, so
+    # thousands of adds and removes never drift) up to date on every change.
     def __init__(self):
-        self.items = []
+        self.items = {}
+        self.total_cents = 0
+        self.item_count = 0
 
     def add_item(self,product,quantity):
-        for item in self.items:
-            if item['product'].product_id == product.product_id:
-                item['quantity'] += quantity
-                return True
-            
-        self.items.append({'product':product,'quantity':quantity})
+        item = self.items.get(product.product_id)
+        if item is None:
+            item = self.items[product.product_id] = {'product':product,'quantity':0,'price_cents':to_cents(product.price)}
+        item['quantity'] += quantity
+        self.total_cents += item['price_cents'] * quantity
+        self.item_count += quantity
         return True
     
     def remove_item(self,product_id):
-        for item in self.items[:]:
-            if item['product'].product_id == product_id:
-                self.items.remove(item)
-                return True
-        return False
+        item = self.items.pop(product_id,None)
+        if item is None:
+            return False
+        self.total_cents -= item['price_cents'] * item['quantity']
+        self.item_count -= item['quantity']
+        return True
     
     def calculate_total(self):
-        total =0
-        for item in self.items:
-            total += item['product'].price * item['quantity']
-        return total
+        return self.total_cents / 100
+
+    def summary(self):
+        lines = [(item['product'].product_id,item['product'].name,item['quantity'],
+                  item['price_cents'] * item['quantity'] / 100) for item in self.items.values()]
+        return {"lines": lines, "item_count": self.item_count, "total": self.calculate_total()}
     
     def view_cart(self):
         if not self.items:
             print("Your cart is  empty.")
             return 0
         
+        summary = self.summary()
         print("\n Your Shopping Cart:")
-        for item in self.items:
-            product = item['product']
-            quantity = item['quantity']
-            subtotal = product.price * quantity
-            print (f"{product.name} x {quantity} - ${subtotal:.2f}")
-        
-        total = self.calculate_total()
-        print(f"Total: ${total:.2f}")
-        return total
+        for _, name, quantity, subtotal in summary["lines"]:
+            print (f"{name} x {quantity} - ${subtotal:.2f}")
+        print(f"Total: ${summary['total']:.2f}")
+        return summary["total"]
     
     def clear_cart(self):
-        self.items = []
+        self.items = {}
+        self.total_cents = 0
+        self.item_count = 0
 
     def get_items(self):
-        return self.items
+        return list(self.items.values())
     
 
 def ecommerce_menu():
     #Sample data
-    products = [
+    catalog = Catalog([
         Product("1001","Laptop",999.99,10),
         Product("1002","Smartphone",699.99,15),
         Product("1003","Headphones",149.99,20)
-    ]
+    ])
+    orders = load_order_book("orders.log")
 
-    users =[
+    users = UserDirectory([
         Admin("admin","admin123"),
         Customer("GoJo","gojo123")
-    ]
+    ])
 
     current_user = None
 
@@ -143,7 +553,7 @@ def ecommerce_menu():
             if choice == '1':
                 username = input("Username: ")
                 password = input("Password: ")
-                user = next ((u for u in users if u.username == username and u.password == password and isinstance(u,Admin)),None)
+                user = users.authenticate(username,password,Admin)
                 if user:
                     current_user = user
                     print(f"Welcome Admin {username}!")
@@ -153,7 +563,7 @@ def ecommerce_menu():
             elif choice == '2':
                 username = input("Username: ")
                 password = input("Password: ")
-                user = next((u for u in users if u.username == username and u.password == password and isinstance(u,Customer)), None)
+                user = users.authenticate(username,password,Customer)
                 if user:
                     current_user = user
                     print(f"Welcome Customer {username}!")
@@ -161,6 +571,7 @@ def ecommerce_menu():
                     print("Invalid custome credentials or user not found.")
 
             elif choice == '3':
+                orders.log.close()
                 print("Exiting E-Commerce System.")
                 break
 
@@ -172,7 +583,8 @@ def ecommerce_menu():
             print("1. Add Product")
             print("2. Update Product Stock")
             print('3. View Products')
-            print("4. Logout")
+            print("4. Sales Report")
+            print("5. Logout")
 
             choice = input("Enter your choice: ")
 
@@ -181,7 +593,7 @@ def ecommerce_menu():
                 name = input("Enter product name: ")
                 price = input("Enter product price: ")
                 stock = input("Enter product stock: ")
-                if current_user.add_product(products, product_id, name, price, stock):
+                if current_user.add_product(catalog, product_id, name, price, stock):
                     print("Product added successfully!")
                 else:
                     print("Product with this ID already exists.")
@@ -189,17 +601,27 @@ def ecommerce_menu():
             elif choice == '2':
                 product_id = input("Enter product ID: ")
                 new_stock = input("Enter new stock quantity: ")
-                if current_user.update_product(products, product_id, new_stock):
-                    print("Stock updated successfully!")
-                else:
-                    print("Product not found.")
+                _, message = current_user.update_product(catalog, product_id, new_stock)
+                print(message)
             
             elif choice == '3':
                 print("\nAll Products:")
-                for product in products:
+                for product in catalog:
                     print(product)
             
             elif choice == '4':
+                today = datetime.now().date().isoformat()
+                print("\nSales Report:")
+                print(f"Orders: {len(orders.orders)} - Revenue: ${orders.total_revenue():.2f} - Today: ${orders.day_revenue(today):.2f}")
+                for product in catalog:
+                    if product.product_id in orders.units_by_product:
+                        print(f"{product.name}: {orders.units_by_product[product.product_id]} sold - "
+                              f"${orders.product_revenue(product.product_id):.2f}")
+                for customer in sorted(orders.revenue_by_customer):
+                    print(f"Customer {customer}: ${orders.customer_revenue(customer):.2f}")
+            
+            elif choice == '5':
+                users.end_session(current_user.username)
                 current_user = None
                 print("Logged out successfully.")
             
@@ -213,26 +635,27 @@ def ecommerce_menu():
             print("3. Remove from Cart")
             print("4. View Cart")
             print("5. Checkout")
-            print("6. Logout")
+            print("6. Search Products")
+            print("7. Logout")
 
             choice = input("Enter your choice: ")
 
             if choice == '1':
                 print("\n Available Products:")
-                for product in products:
+                for product in catalog:
                     print(product)
 
             elif choice == '2':
                 product_id = input("Enter product ID: ")
                 quantity = int(input("Enter quantity: "))
-                if current_user.add_to_cart(products,product_id,quantity):
+                if current_user.add_to_cart(catalog,product_id,quantity):
                     print("Product added to cart!")
                 else:
                     print("Product not found or insufficient stock.")
 
             elif choice == '3':
                 product_id = input("Enter product ID to remove: ")
-                if current_user.remove_from_cart(product_id):
+                if current_user.remove_from_cart(catalog, product_id):
                     print("Product removed from cart.")
                 else:
                     print("Product not found in your cart.")
@@ -241,11 +664,26 @@ def ecommerce_menu():
                 current_user.view_cart()
 
             elif choice == '5':
-                total = current_user.checkout(products)
-                if total >0:
-                    print(f"Order completed! Total : ${total:.2f}")
+                if current_user.view_cart():
+                    total, message = current_user.checkout(catalog, orders)
+                    if total >0:
+                        print(f"{message} Order completed! Total : ${total:.2f}")
+                    else:
+                        print(message)
 
             elif choice == '6':
+                prefix = input("Name starts with (blank for any): ")
+                low = input("Minimum price (blank for none): ") or None
+                high = input("Maximum price (blank for none): ") or None
+                results = catalog.search(prefix,low,high,limit=50)
+                if results:
+                    for product in results:
+                        print(product)
+                else:
+                    print("No matching products.")
+
+            elif choice == '7':
+                users.end_session(current_user.username)
                 current_user = None
                 print("Logged out successfully.")
 
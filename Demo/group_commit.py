@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+
+class GroupCommitLog:
+    # Append-only line log with group commit. append() queues a line and
+    # returns its ticket; wait(ticket) returns once that line is on disk. The
+    # first waiter that finds no write in progress writes every queued line
+    # with a single fsync, while callers arriving meanwhile queue up for the
+    # next one. Concurrent callers share fsyncs and nobody sleeps on a timer,
+    # and no caller is told its record is saved before it is.
+    def __init__(self,path):
+        self.path = path
+        self.file = open(path,"a")
+        self.pending = []
+        self.appended = 0
+        self.durable = 0
+        self.writing = False
+        self.condition = threading.Condition()
+
+    def append(self,line):
+        with self.condition:
+            self.pending.append(line)
+            self.appended += 1
+            return self.appended
+
+    def wait(self,ticket):
+        with self.condition:
+            while self.durable < ticket:
+                if self.writing:
+                    self.condition.wait()
+                else:
+                    self.__write_pending()
+
+    def commit(self):
+        with self.condition:
+            self.__drain()
+
+    def truncate(self):
+        # Drops everything written so far, e.g. once it is in a snapshot.
+        with self.condition:
+            self.__drain()
+            self.file.close()
+            self.file = open(self.path,"w")
+
+    def close(self):
+        with self.condition:
+            self.__drain()
+            self.file.close()
+
+    def __drain(self):
+        while self.writing:
+            self.condition.wait()
+        self.__write_pending()
+
+    # Called holding the condition; releases it during the write and fsync.
+    def __write_pending(self):
+        lines, self.pending = self.pending, []
+        last = self.appended
+        if not lines:
+            self.durable = last
+            return
+        self.writing = True
+        self.condition.release()
+        try:
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        except BaseException:
+            self.condition.acquire()
+            self.pending[:0] = lines
+            self.writing = False
+            self.condition.notify_all()
+            raise
+        self.condition.acquire()
+        self.durable = last
+        self.writing = False
+        self.condition.notify_all()
+
+def read_records(path,parse=json.loads):
+    # Yields parse(line) for each complete line of an append-only log. A crash
+    # mid-write can leave a torn last line: it is cut off the file, so the
+    # next append starts on a fresh line instead of being glued onto it.
+    good_offset = 0
+    torn = False
+    try:
+        with open(path,"rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    torn = True
+                    break
+                try:
+                    record = parse(line)
+                except (ValueError, TypeError, KeyError):
+                    torn = True
+                    break
+                good_offset += len(line)
+                yield record
+    except FileNotFoundError:
+        return
+    if torn:
+        with open(path,"r+b") as f:
+            f.truncate(good_offset)
@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from hospital_management import (HospitalSystem, JsonSectionReader, Doctor, Nurse, Patient,
+                                 Appointment, MedicalRecord)
+from hospital_storage import SQLiteStorage
+
+def slot(i,doctors):
+    # Appointments for the same doctor are 30 minutes apart.
+    return (datetime(2026,1,1,9,0) + timedelta(minutes=30 * (i // doctors))).strftime("%Y-%m-%d %H:%M")
+
+def write_export(filename,patients,doctors=100):
+    # Writes a save_data-shaped file entry by entry so the generator itself
+    # does not need the whole hospital in memory.
+    def section(f,name,entries,last=False):
+        f.write(f'"{name}": {{')
+        for i,(key,value) in enumerate(entries):
+            f.write(("" if i == 0 else ", ") + json.dumps(key) + ": " + json.dumps(value))
+        f.write("}" if last else "}, ")
+
+    with open(filename,"w") as f:
+        f.write("{")
+        section(f,"patients",((f"P{i}",{"name": f"Patient {i}","age": 20 + i % 60,"gender": "F","person_id": f"P{i}",
+                                         "symptoms": ["cough"],"assigned_doctor_id": f"D{i % doctors}"})
+                              for i in range(patients)))
+        section(f,"doctors",((f"D{i}",{"name": f"Doctor {i}","age": 40,"gender": "M","person_id": f"D{i}",
+                                       "specialization": "General"}) for i in range(doctors)))
+        section(f,"nurses",((f"N{i}",{"name": f"Nurse {i}","age": 30,"gender": "F","person_id": f"N{i}",
+                                      "assigned_ward": f"W{i % 10}","shift_time": "Day"}) for i in range(doctors)))
+        section(f,"appointments",((f"A{i}",{"appointment_id": f"A{i}","doctor_id": f"D{i % doctors}",
+                                            "patient_id": f"P{i}","datetime": slot(i,doctors),
+                                            "status": "Scheduled"}) for i in range(patients)))
+        section(f,"records",((f"R{i}",{"record_id": f"R{i}","patient_id": f"P{i}","diagnosis": "Flu",
+                                       "prescription": "Rest","doctor_id": f"D{i % doctors}","date": "2026-01-01"})
+                             for i in range(patients)),last=True)
+        f.write("}")
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+def benchmark_streaming_load(sizes):
+    print(f"{'patients':>10} {'file MB':>8} {'stream peak KB':>15} {'import s':>9} {'import peak KB':>15} {'entries/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            export = os.path.join(directory,f"export_{size}.json")
+            database = os.path.join(directory,f"hospital_{size}.db")
+            write_export(export,size)
+
+            _, _, stream_peak = measure(lambda: sum(1 for _ in JsonSectionReader(export)))
+
+            def import_export():
+                hospital = HospitalSystem(SQLiteStorage(database))
+                stats = hospital.load_data(export)
+                hospital.storage.close()
+                return stats
+            stats, seconds, import_peak = measure(import_export)
+
+            print(f"{size:>10,} {os.path.getsize(export) / 1e6:>8.1f} {stream_peak / 1024:>15,.0f} "
+                  f"{seconds:>9.2f} {import_peak / 1024:>15,.0f} {stats['entries_per_sec']:>10,.0f}")
+
+def slot_names(cls):
+    return [name for klass in cls.__mro__ for name in getattr(klass,"__slots__",())]
+
+def build_entities():
+    doctor = Doctor("Doctor",40,"M","D0","General")
+    return {
+        "Doctor": lambda i: Doctor(f"Doctor {i}",40,"M",f"D{i}","General"),
+        "Nurse": lambda i: Nurse(f"Nurse {i}",30,"F",f"N{i}","W1","Day"),
+        "Patient": lambda i: Patient(f"Patient {i}",20 + i % 60,"F",f"P{i}"),
+        "Appointment": lambda i: Appointment(f"A{i}",doctor,None,slot(i,1)),
+        "MedicalRecord": lambda i: MedicalRecord(f"R{i}",None,"Flu","Rest",doctor,"2026-01-01"),
+    }
+
+def bytes_per(count,make):
+    tracemalloc.start()
+    objects = [make(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(objects), objects
+
+def benchmark_entity_memory(count):
+    # "dict" is each entity's attributes in a plain __dict__ object, which is
+    # what every entity was before __slots__. Both columns share the same
+    # attribute values, so the difference is the object overhead alone.
+    print(f"{'entity':>14} {'slots B':>8} {'dict B':>8} {'saved':>6} {'with values B':>14}")
+    for name, make in build_entities().items():
+        full, entities = bytes_per(count,make)
+        names = slot_names(type(entities[0]))
+
+        def slotted(i):
+            entity = entities[i]
+            copy = type(entity).__new__(type(entity))
+            for attribute in names:
+                setattr(copy,attribute,getattr(entity,attribute))
+            return copy
+        slots_size, _ = bytes_per(count,slotted)
+        dict_size, _ = bytes_per(count,lambda i: SimpleNamespace(**{attribute: getattr(entities[i],attribute)
+                                                                    for attribute in names}))
+        print(f"{name:>14} {slots_size:>8.0f} {dict_size:>8.0f} {1 - slots_size / dict_size:>6.0%} {full:>14.0f}")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    benchmark_entity_memory(100_000)
+    print()
+    benchmark_streaming_load(sizes)
@@ -1,41 +1,106 @@
+import heapq
 import json
-from datetime import datetime
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from id_generator import new_id
 
 class Person:
+    # Slots instead of a per-instance __dict__: with millions of patients
+    # and appointments loaded, the dict is most of each object's size.
+    __slots__ = ("name","age","gender","person_id")
+
     def __init__(self,name,age,gender,person_id):
-        self. name = name
+        self.name = name
         self.age = age
         self.gender = gender
         self.person_id = person_id
 
+    def to_dict(self):
+        return {"name": self.name, "age": self.age, "gender": self.gender, "person_id": self.person_id}
+
 class Doctor(Person):
+    __slots__ = ("specialization","schedule","patients_assigned")
+
     def __init__(self,name,age,gender,person_id,specialization):
         super().__init__(name,age,gender,person_id)
         self.specialization = specialization
-        self.schedule = []
+        self.schedule = DoctorSchedule()
         self.patients_assigned = []
-        
+
+    def to_dict(self):
+        data = super().to_dict()
+        data["specialization"] = self.specialization
+        return data
 
 class Nurse(Person):
+    __slots__ = ("assigned_ward","shift_time")
+
     def __init__(self,name,age,gender,person_id,assigned_ward,shift_time):
         super().__init__(name,age,gender,person_id)
         self.assigned_ward = assigned_ward
         self.shift_time = shift_time
 
+    def to_dict(self):
+        data = super().to_dict()
+        data["assigned_ward"] = self.assigned_ward
+        data["shift_time"] = self.shift_time
+        return data
+
 class Patient(Person):
+    __slots__ = ("symptoms","timeline","assigned_doctor","ward")
+
     def __init__(self,name,age,gender,person_id):
         super().__init__(name,age,gender,person_id)
         self.symptoms = []
-        self.medical_history = []
+        self.timeline = PatientTimeline()
         self.assigned_doctor = None
+        self.ward = None
+
+    # Appointments and records merged in date order, derived from the
+    # timeline on every access. It is a tuple so that appending to it fails
+    # loudly: entries are added through timeline.add_appointment and
+    # timeline.add_record (as create_appointment and log_medical_record do).
+    # Views that only need one kind should read self.timeline directly.
+    @property
+    def medical_history(self):
+        return tuple(entry for _, entry in self.timeline.history())
+
+    def to_dict(self):
+        data = super().to_dict()
+        data["symptoms"] = self.symptoms
+        data["assigned_doctor_id"] = self.assigned_doctor.person_id if self.assigned_doctor else None
+        data["ward"] = self.ward
+        return data
+
+def parse_appointment_time(value):
+    if isinstance(value,datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+# The stored form of an appointment time, e.g. "2026-01-05 09:00", so saved
+# appointments are JSON-serializable strings that also sort by time.
+def format_appointment_time(moment):
+    return moment.isoformat(" ","minutes" if not (moment.second or moment.microsecond) else "seconds")
 
 class Appointment:
-    def __init__(self,appointment_id,doctor,patient,datetime,status="Scheduled"):
+    __slots__ = ("appointment_id","doctor","patient","datetime","status","duration","start","end")
+
+    def __init__(self,appointment_id,doctor,patient,datetime,status="Scheduled",duration=30):
         self.appointment_id = appointment_id
         self.doctor = doctor
         self.patient = patient
-        self.datetime = datetime
         self.status = status
+        self.duration = duration
+        self.start = parse_appointment_time(datetime)
+        self.datetime = format_appointment_time(self.start)
+        self.end = self.start + timedelta(minutes=duration)
+
+    def is_active(self):
+        return self.status != "Cancelled"
 
     def add_entry(self,new_status):
         self.status = new_status
@@ -43,7 +108,256 @@ class Appointment:
     def view_history(self):
         return f"Appointment {self.appointment_id}: {self.datetime} - Status : { self.status}"
 
+class DoctorSchedule:
+    # A doctor's appointments in start-time order. Active (non-cancelled)
+    # appointments are also kept in a second index that never overlaps, so
+    # its start and end lists are both sorted and a conflict check, the next
+    # free slot and range queries are all bisect lookups.
+    __slots__ = ("loader","starts","appointments","busy_starts","busy_ends","busy")
+
+    def __init__(self,loader=None):
+        self.loader = loader
+        self.starts = []
+        self.appointments = []
+        self.busy_starts = []
+        self.busy_ends = []
+        self.busy = []
+
+    def load(self):
+        if self.loader is not None:
+            loader, self.loader = self.loader, None
+            for appointment in loader():
+                self.__insert(appointment)
+                # Stored data may predate conflict checks; an overlapping
+                # entry is listed but not allowed to break the busy index.
+                if appointment.is_active() and not self.conflicts(appointment.start,appointment.end):
+                    self.__reserve(appointment)
+        return self
+
+    def conflicts(self,start,end):
+        self.load()
+        i = bisect_left(self.busy_starts,end)
+        return i > 0 and self.busy_ends[i - 1] > start
+
+    def add(self,appointment):
+        self.load()
+        if appointment.is_active():
+            if self.conflicts(appointment.start,appointment.end):
+                return False
+            self.__reserve(appointment)
+        self.__insert(appointment)
+        return True
+
+    def release(self,appointment):
+        self.load()
+        i = bisect_left(self.busy_starts,appointment.start)
+        while i < len(self.busy) and self.busy_starts[i] == appointment.start:
+            if self.busy[i] is appointment:
+                del self.busy_starts[i]
+                del self.busy_ends[i]
+                del self.busy[i]
+                return True
+            i += 1
+        return False
+
+    def reserve(self,appointment):
+        self.load()
+        if self.conflicts(appointment.start,appointment.end):
+            return False
+        self.__reserve(appointment)
+        return True
+
+    def next_free_slot(self,after,duration=30):
+        self.load()
+        after = parse_appointment_time(after)
+        length = timedelta(minutes=duration)
+        i = bisect_right(self.busy_starts,after)
+        candidate = after
+        if i > 0 and self.busy_ends[i - 1] > candidate:
+            candidate = self.busy_ends[i - 1]
+        while i < len(self.busy) and self.busy_starts[i] < candidate + length:
+            candidate = max(candidate,self.busy_ends[i])
+            i += 1
+        return candidate
+
+    def between(self,start,end):
+        self.load()
+        lo = bisect_left(self.starts,parse_appointment_time(start))
+        hi = bisect_left(self.starts,parse_appointment_time(end))
+        return self.appointments[lo:hi]
+
+    def __insert(self,appointment):
+        i = bisect_right(self.starts,appointment.start)
+        self.starts.insert(i,appointment.start)
+        self.appointments.insert(i,appointment)
+
+    def __reserve(self,appointment):
+        i = bisect_right(self.busy_starts,appointment.start)
+        self.busy_starts.insert(i,appointment.start)
+        self.busy_ends.insert(i,appointment.end)
+        self.busy.insert(i,appointment)
+
+    def __iter__(self):
+        return iter(self.load().appointments)
+
+    def __len__(self):
+        return len(self.load().appointments)
+
+    def __contains__(self,appointment):
+        return appointment in self.load().appointments
+
+EPOCH = datetime(1970,1,1)
+
+def timeline_key(value):
+    return int((parse_appointment_time(value) - EPOCH).total_seconds())
+
+class TimelineStore:
+    # Entries of one kind sorted by time. Keys are seconds since the epoch in
+    # a compact int64 array; a range is two bisects and a page is a slice.
+    __slots__ = ("loader","keys","entries")
+
+    def __init__(self,loader=None):
+        self.loader = loader
+        self.keys = array("q")
+        self.entries = []
+
+    def load(self):
+        if self.loader is not None:
+            loader, self.loader = self.loader, None
+            for key, entry in loader():
+                self.add(key,entry)
+        return self
+
+    def add(self,when,entry):
+        self.load()
+        key = timeline_key(when)
+        # New entries are usually the latest, which makes this an append.
+        if not self.keys or self.keys[-1] <= key:
+            self.keys.append(key)
+            self.entries.append(entry)
+        else:
+            i = bisect_right(self.keys,key)
+            self.keys.insert(i,key)
+            self.entries.insert(i,entry)
+
+    def between(self,start=None,end=None,offset=0,limit=None,newest_first=False):
+        self.load()
+        lo = 0 if start is None else bisect_left(self.keys,timeline_key(start))
+        hi = len(self.keys) if end is None else bisect_left(self.keys,timeline_key(end))
+        if newest_first:
+            top = hi - offset
+            bottom = lo if limit is None else max(lo,top - limit)
+            return self.entries[bottom:max(top,bottom)][::-1]
+        first = lo + offset
+        last = hi if limit is None else min(hi,first + limit)
+        return self.entries[first:last]
+
+    def __iter__(self):
+        return iter(self.load().entries)
+
+    def __len__(self):
+        return len(self.load().entries)
+
+class PatientTimeline:
+    __slots__ = ("appointments","records")
+
+    def __init__(self,appointment_loader=None,record_loader=None):
+        self.appointments = TimelineStore(appointment_loader)
+        self.records = TimelineStore(record_loader)
+
+    def add_appointment(self,appointment):
+        self.appointments.add(appointment.start,appointment)
+
+    def add_record(self,record):
+        self.records.add(record.date,record)
+
+    def appointments_between(self,start=None,end=None,offset=0,limit=None,newest_first=False):
+        return self.appointments.between(start,end,offset,limit,newest_first)
+
+    def records_between(self,start=None,end=None,offset=0,limit=None,newest_first=False):
+        return self.records.between(start,end,offset,limit,newest_first)
+
+    def recent_records(self,days=90,offset=0,limit=None,now=None):
+        now = now or datetime.now()
+        return self.records.between(now - timedelta(days=days),None,offset,limit,newest_first=True)
+
+    def history(self):
+        appointments = (("appointment",a) for a in self.appointments)
+        records = (("record",r) for r in self.records)
+        return heapq.merge(appointments,records,key=lambda item: item[1].start if item[0] == "appointment"
+                           else parse_appointment_time(item[1].date))
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+",text.lower())
+
+class RecordSearchIndex:
+    # Inverted index from the words of each record's diagnosis and
+    # prescription to the records containing them. The vocabulary is also
+    # kept sorted, so every word starting with a prefix is one bisect range.
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = []
+        self.record_terms = {}
+        self.by_patient = {}
+        self.by_doctor = {}
+
+    def add(self,record):
+        terms = set(tokenize(record.diagnosis)) | set(tokenize(record.prescription))
+        self.record_terms[record.record_id] = terms
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                insort(self.vocabulary,term)
+            postings[record.record_id] = record
+        self.by_patient.setdefault(record.patient.person_id,{})[record.record_id] = record
+        self.by_doctor.setdefault(record.doctor.person_id,{})[record.record_id] = record
+
+    def remove(self,record):
+        for term in self.record_terms.pop(record.record_id,()):
+            postings = self.postings[term]
+            del postings[record.record_id]
+            if not postings:
+                del self.postings[term]
+                del self.vocabulary[bisect_left(self.vocabulary,term)]
+        self.by_patient.get(record.patient.person_id,{}).pop(record.record_id,None)
+        self.by_doctor.get(record.doctor.person_id,{}).pop(record.record_id,None)
+
+    def __matching(self,term,prefix):
+        if not prefix:
+            return self.postings.get(term,{})
+        lo = bisect_left(self.vocabulary,term)
+        hi = bisect_left(self.vocabulary,term + "\uffff")
+        if hi - lo == 1:
+            return self.postings[self.vocabulary[lo]]
+        matches = {}
+        for word in self.vocabulary[lo:hi]:
+            matches.update(self.postings[word])
+        return matches
+
+    # Every query word must match (as a prefix unless prefix=False). Patient
+    # and doctor filters are intersected like extra words, smallest set first.
+    def search(self,text,patient_id=None,doctor_id=None,prefix=True,limit=None):
+        candidates = [self.__matching(term,prefix) for term in tokenize(text)]
+        if patient_id is not None:
+            candidates.append(self.by_patient.get(patient_id,{}))
+        if doctor_id is not None:
+            candidates.append(self.by_doctor.get(doctor_id,{}))
+        if not candidates:
+            return []
+        candidates.sort(key=len)
+        smallest, others = candidates[0], candidates[1:]
+        results = []
+        for record_id, record in smallest.items():
+            if all(record_id in other for other in others):
+                results.append(record)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
 class MedicalRecord:
+    __slots__ = ("record_id","patient","diagnosis","prescription","doctor","date","search_index")
+
     def __init__(self,record_id,patient,diagnosis,prescription,doctor,date):
         self.record_id = record_id
         self.patient = patient
@@ -51,22 +365,129 @@ class MedicalRecord:
         self.prescription = prescription
         self.doctor = doctor
         self.date = date
+        self.search_index = None
 
     def add_entry(self,new_diagnosis,new_prescription):
+        if self.search_index is not None:
+            self.search_index.remove(self)
         self.diagnosis = new_diagnosis
         self.prescription = new_prescription
+        if self.search_index is not None:
+            self.search_index.add(self)
 
     def view_history(self):
         return f"Record {self.record_id} ({self.date}):\nDiagnosis:{self.diagnosis}\nPrescription: {self.prescription}"
 
+class JsonSectionReader:
+    # Streams a file shaped like {"section": {"key": value, ...}, ...} one
+    # entry at a time. Only the current chunk and the entry being decoded are
+    # held in memory, however large the file is.
+    def __init__(self,filename,chunk_size=1 << 16):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.chars_read = 0
+
+    def __iter__(self):
+        with open(self.filename,'r') as f:
+            self.file = f
+            self.buffer = ""
+            self.pos = 0
+            self.eof = False
+            self.chars_read = 0
+            self.__expect("{")
+            while not self.__consume("}"):
+                section = self.__value()
+                self.__expect(":")
+                self.__expect("{")
+                while not self.__consume("}"):
+                    key = self.__value()
+                    self.__expect(":")
+                    yield section, key, self.__value()
+                    self.__consume(",")
+                self.__consume(",")
+
+    def __refill(self):
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.chars_read += len(chunk)
+        return True
+
+    def __skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.__refill():
+                return
+
+    def __consume(self,char):
+        self.__skip_whitespace()
+        if self.buffer.startswith(char,self.pos):
+            self.pos += 1
+            return True
+        return False
+
+    def __expect(self,char):
+        if not self.__consume(char):
+            raise ValueError(f"Expected '{char}' in {self.filename} near offset {self.chars_read - len(self.buffer) + self.pos}")
+
+    def __value(self):
+        self.__skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer,self.pos)
+                # A value that runs to the end of the buffer may continue in
+                # the next chunk (e.g. a number), so only trust it at EOF.
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.__refill()
+
+class LoadProgress:
+    def __init__(self,callback=None,report_every=10000):
+        self.callback = callback
+        self.report_every = report_every
+        self.start = time.perf_counter()
+        self.counts = {}
+        self.entries = 0
+
+    def tick(self,section,reader):
+        self.counts[section] = self.counts.get(section,0) + 1
+        self.entries += 1
+        if self.callback and self.entries % self.report_every == 0:
+            self.callback(self.stats(reader))
+
+    def stats(self,reader):
+        seconds = time.perf_counter() - self.start
+        return {
+            "counts": dict(self.counts),
+            "entries": self.entries,
+            "chars_read": reader.chars_read,
+            "seconds": seconds,
+            "entries_per_sec": self.entries / seconds if seconds else 0.0
+        }
+
 class HospitalSystem:
-    def __init__(self):
+    def __init__(self,storage=None):
         self.patients ={}
         self.nurses = {}
         self.doctors = {}
         self.appointments = {}
         self.records = {}
+        self.wards = {}
         self.current_user = None
+        self.storage = storage
+        # With storage, searches run against the database's full-text index.
+        self.search_index = None if storage else RecordSearchIndex()
+        if storage:
+            storage.attach(self)
 
     def add_person(self,person_type,**kwargs):
         if person_type == "patient":
@@ -78,6 +499,10 @@ class HospitalSystem:
         elif person_type == 'nurse':
             person = Nurse(**kwargs)
             self.nurses[person.person_id] = person
+        else:
+            return None
+        if self.storage:
+            self.storage.save_person(person_type,person)
         return person
 
     def find_person_by_id(self,person_id):
@@ -89,14 +514,45 @@ class HospitalSystem:
             return self.nurses[person_id]
         return None
 
-    def create_appointment(self,appointment_id,doctor_id,patient_id, datetime):
+    # Returns None if either id is unknown, the time cannot be parsed or the
+    # doctor is already booked for an overlapping slot.
+    def create_appointment(self,appointment_id,doctor_id,patient_id, datetime,status="Scheduled",duration=30):
         doctor = self.doctors.get(doctor_id)
         patient = self.patients.get(patient_id)
         if doctor and patient:
-            appointment = Appointment(appointment_id,doctor,patient,datetime)
+            try:
+                appointment = Appointment(appointment_id,doctor,patient,datetime,status,duration)
+            except ValueError:
+                return None
+            if not doctor.schedule.add(appointment):
+                return None
             self.appointments[appointment_id] = appointment
-            doctor.schedule.append(appointment)
-            patient.medical_history.append(appointment)
+            patient.timeline.add_appointment(appointment)
+            if self.storage:
+                self.storage.save_appointment(appointment)
+            return appointment
+        return None
+
+    def next_free_slot(self,doctor_id,after,duration=30):
+        doctor = self.doctors.get(doctor_id)
+        if doctor:
+            try:
+                return doctor.schedule.next_free_slot(after,duration)
+            except ValueError:
+                return None
+        return None
+
+    def update_appointment_status(self,appointment_id,new_status):
+        appointment = self.appointments.get(appointment_id)
+        if appointment:
+            schedule = appointment.doctor.schedule
+            if appointment.is_active() and new_status == "Cancelled":
+                schedule.release(appointment)
+            elif not appointment.is_active() and new_status != "Cancelled" and not schedule.reserve(appointment):
+                return None
+            appointment.add_entry(new_status)
+            if self.storage:
+                self.storage.save_appointment(appointment)
             return appointment
         return None
 
@@ -106,34 +562,101 @@ class HospitalSystem:
         if doctor and patient:
             patient.assigned_doctor = doctor
             doctor.patients_assigned.append(patient)
+            if self.storage:
+                self.storage.save_patient_doctor(patient)
             return True
         return False
-        
 
-    def log_medical_record(self,record_id,patient_id,diagnosis,prescription,doctor_id):
+
+    # Ward membership is kept as ward -> {patient_id: patient}, updated on
+    # admission, transfer and discharge, so listing a ward never touches
+    # patients in other wards. With storage the patients table's ward index
+    # plays the same role.
+    def admit_patient(self,patient_id,ward):
+        patient = self.patients.get(patient_id)
+        if not patient or not ward:
+            return False
+        if patient.ward is not None:
+            self.__leave_ward(patient)
+        patient.ward = ward
+        self.wards.setdefault(ward,{})[patient_id] = patient
+        if self.storage:
+            self.storage.save_patient_ward(patient)
+        return True
+
+    def transfer_patient(self,patient_id,new_ward):
+        patient = self.patients.get(patient_id)
+        if not patient or patient.ward is None:
+            return False
+        return self.admit_patient(patient_id,new_ward)
+
+    def discharge_patient(self,patient_id):
+        patient = self.patients.get(patient_id)
+        if not patient or patient.ward is None:
+            return False
+        self.__leave_ward(patient)
+        patient.ward = None
+        if self.storage:
+            self.storage.save_patient_ward(patient)
+        return True
+
+    def __leave_ward(self,patient):
+        members = self.wards.get(patient.ward)
+        if members is not None:
+            members.pop(patient.person_id,None)
+            if not members:
+                del self.wards[patient.ward]
+
+    def get_ward_patients(self,ward):
+        if self.storage:
+            return [self.patients[patient_id] for patient_id in self.storage.ward_patient_ids(ward)]
+        return list(self.wards.get(ward,{}).values())
+
+    def log_medical_record(self,record_id,patient_id,diagnosis,prescription,doctor_id,date=None):
         patient = self.patients.get(patient_id)
         doctor = self.doctors.get(doctor_id)
         if patient and doctor:
-            record = MedicalRecord(record_id, patient,diagnosis,prescription,doctor,datetime.now().strftime("%Y-%m-%d"))
+            record = MedicalRecord(record_id, patient,diagnosis,prescription,doctor,date or datetime.now().strftime("%Y-%m-%d"))
             self.records[record_id] = record
-            patient.medical_history.append(record)
+            patient.timeline.add_record(record)
+            if self.search_index is not None:
+                record.search_index = self.search_index
+                self.search_index.add(record)
+            if self.storage:
+                self.storage.save_record(record)
             return record
         return None
 
+    def update_medical_record(self,record_id,new_diagnosis,new_prescription):
+        record = self.records.get(record_id)
+        if record:
+            record.add_entry(new_diagnosis,new_prescription)
+            if self.storage:
+                self.storage.save_record(record)
+            return record
+        return None
+
+    def search_records(self,text,patient_id=None,doctor_id=None,prefix=True,limit=None):
+        if self.storage:
+            return [self.records[record_id]
+                    for record_id in self.storage.search_record_ids(text,patient_id,doctor_id,prefix,limit)]
+        return self.search_index.search(text,patient_id,doctor_id,prefix,limit)
+
     def view_all_appointments(self):
         return list(self.appointments.values())
 
     def save_data(self,filename):
         data = {
-            "patients": {pid: vars(p) for pid,p in self.patients.items()},
-            "doctors": {pid: vars(d) for pid,d in self.doctors.items()},
-            "nurses": {pid: vars(n) for pid, n in self.nurses.items()},
+            "patients": {pid: p.to_dict() for pid,p in self.patients.items()},
+            "doctors": {pid: d.to_dict() for pid,d in self.doctors.items()},
+            "nurses": {pid: n.to_dict() for pid, n in self.nurses.items()},
             "appointments": {aid:{
                 "appointment_id": a.appointment_id,
                 "doctor_id": a.doctor.person_id,
                 "patient_id": a.patient.person_id,
-                "datetime": a.dateime,
-                "status": a.status
+                "datetime": a.datetime,
+                "status": a.status,
+                "duration": a.duration
             } for aid,a in self.appointments.items()},
             "records":{rid: {
                 "record_id": r.record_id,
@@ -147,252 +670,356 @@ class HospitalSystem:
         with open(filename,'w') as f:
             json.dump(data,f)
 
-    def load_data(self,filename):
+    # Loads a save_data export section by section. People are created on the
+    # first pass; the second pass resolves doctor and patient ids for
+    # assignments, appointments and records, so section order does not
+    # matter. progress, if given, is called with LoadProgress stats.
+    def load_data(self,filename,progress=None,report_every=10000):
+        if self.storage:
+            return self.storage.import_json(filename,progress,report_every)
+
+        reader = JsonSectionReader(filename)
+        tracker = LoadProgress(progress,report_every)
         try:
-            with open(filename,'r') as f:
-                data = json.load(f)
-
-                for p_data in data.get("patients",{}).items():
-                    self.add_person("patient",**p_data)
-
-                for d_data in data.get("doctors",{}).items():
-                    self.add_person("doctor",**d_data)
-
-                for n_data in data.get("nurses",{}).items():
-                    self.add_person("nurse",**n_data)
-
-                for aid,a_data in data.get("appointments",{}).items():
-                    doctor = self.doctors.get(a_data["doctor_id"])
-                    patient = self.patients.get(a_data["patient_id"])
-                    if doctor and patient:
-                        appointment = Appointment(
-                            a_data["appointment_id"],
-                            doctor,
-                            patient,
-                            a_data["datetime"],
-                            a_data["status"]
-                        )
-                        self.appointments[aid] = appointment
-                        doctor.schedule.append(appointment)
-                        patient.medical_history.append(appointment)
-
-                for rid, r_data in data.get("records", {}).items():
-                    patient = self.patients.get(r_data["patient_id"])
-                    doctor = self.doctors.get(r_data["doctor_id"])
-                    if patient and doctor:
-                        record = MedicalRecord(
-                            r_data["record_id"],
-                            patient,
-                            r_data["diagnosis"],
-                            r_data["prescription"],
-                            doctor,
-                            r_data["date"]
-                        )
-                        self.records[rid] = record
-                        patient.medical_history.append(record)
+            for section, _, data in reader:
+                if section == "patients":
+                    symptoms = data.pop("symptoms",[])
+                    ward = data.pop("ward",None)
+                    data.pop("assigned_doctor_id",None)
+                    patient = self.add_person("patient",**data)
+                    patient.symptoms = symptoms
+                    if ward:
+                        self.admit_patient(patient.person_id,ward)
+                elif section == "doctors":
+                    self.add_person("doctor",**data)
+                elif section == "nurses":
+                    self.add_person("nurse",**data)
+                else:
+                    continue
+                tracker.tick(section,reader)
+
+            for section, _, data in reader:
+                if section == "patients":
+                    if data.get("assigned_doctor_id"):
+                        self.assign_doctor_to_patient(data["assigned_doctor_id"],data["person_id"])
+                    continue
+                elif section == "appointments":
+                    self.create_appointment(data["appointment_id"],data["doctor_id"],data["patient_id"],
+                                            data["datetime"],data["status"],data.get("duration",30))
+                elif section == "records":
+                    self.log_medical_record(data["record_id"],data["patient_id"],data["diagnosis"],
+                                            data["prescription"],data["doctor_id"],data["date"])
+                else:
+                    continue
+                tracker.tick(section,reader)
         except FileNotFoundError:
             pass
+        return tracker.stats(reader)
+
+class MenuAction:
+    def __init__(self,role,key,name,label,handler,prompts=(),exits=False):
+        self.role = role
+        self.key = key
+        self.name = name
+        self.label = label
+        self.handler = handler
+        self.prompts = prompts
+        self.exits = exits
+
+class MenuRegistry:
+    # Roles map to their menu title and actions; each action maps to a
+    # handler(hospital, **fields) returning (success, message). The
+    # interactive menu asks for the fields with input(); scripts pass them in.
+    def __init__(self):
+        self.titles = {}
+        self.by_key = {}
+        self.by_name = {}
+
+    def add_role(self,role,title):
+        self.titles[role] = title
+        self.by_key[role] = {}
+        self.by_name[role] = {}
+
+    def action(self,role,key,name,label,prompts=(),exits=False):
+        def register(handler):
+            action = MenuAction(role,key,name,label,handler,prompts,exits)
+            self.by_key[role][key] = action
+            self.by_name[role][name] = action
+            return handler
+        return register
+
+    def options(self,role):
+        return [f"{key}. {action.label}" for key, action in self.by_key[role].items()]
+
+    def run(self,hospital,action,fields):
+        expected = [name for name, _ in action.prompts]
+        missing = [name for name in expected if name not in fields]
+        if missing:
+            return False, f"Missing {', '.join(missing)} for {action.role}.{action.name}."
+        unknown = [name for name in fields if name not in expected]
+        if unknown:
+            return False, f"Unknown field {', '.join(unknown)} for {action.role}.{action.name}."
+        return action.handler(hospital,**fields)
+
+def user_role(user):
+    if user is None:
+        return "login"
+    if isinstance(user,dict):
+        return user.get("role")
+    return type(user).__name__.lower()
+
+HOSPITAL_MENUS = MenuRegistry()
+HOSPITAL_MENUS.add_role("login","Hospital Management System\nPlease log in as:")
+HOSPITAL_MENUS.add_role("doctor","Doctor Menu")
+HOSPITAL_MENUS.add_role("receptionist","Receptionist Menu")
+HOSPITAL_MENUS.add_role("patient","Patient Menu")
+HOSPITAL_MENUS.add_role("nurse","Nurse Menu")
+
+def log_in(hospital,people,person_id,greeting,title):
+    if person_id in people:
+        hospital.current_user = people[person_id]
+        return True, greeting.format(hospital.current_user.name)
+    return False, f"{title} not found."
+
+@HOSPITAL_MENUS.action("login","1","doctor","Doctor",[("person_id","Enter your doctor ID: ")])
+def login_doctor(hospital,person_id):
+    return log_in(hospital,hospital.doctors,person_id,"Welcome Dr. {}!","Doctor")
+
+@HOSPITAL_MENUS.action("login","2","nurse","Nurse",[("person_id","Enter your nurse ID: ")])
+def login_nurse(hospital,person_id):
+    return log_in(hospital,hospital.nurses,person_id,"Welcome Nurse {}!","Nurse")
+
+@HOSPITAL_MENUS.action("login","3","receptionist","Receptionist")
+def login_receptionist(hospital):
+    hospital.current_user = {"role": "receptionist"}
+    return True, "Welcome Receptionist!"
 
-def hospital_menu():
-    hospital = HospitalSystem()
-    hospital.load_data("hospital_data.json")
+@HOSPITAL_MENUS.action("login","4","patient","Patient",[("person_id","Enter your patient ID: ")])
+def login_patient(hospital,person_id):
+    return log_in(hospital,hospital.patients,person_id,"Welcome {}!","Patient")
 
+@HOSPITAL_MENUS.action("login","5","exit","Exit",exits=True)
+def exit_system(hospital):
+    if hospital.storage:
+        hospital.storage.close()
+    return True, "Exiting Hospital System."
+
+def logout(hospital):
+    hospital.current_user = None
+    return True, "Logged out successfully."
+
+@HOSPITAL_MENUS.action("doctor","1","appointments","View Appointments")
+def doctor_appointments(hospital):
+    lines = ["\nYour Appointments: "]
+    for appt in hospital.current_user.schedule:
+        lines.append(f"{appt.datetime} - {appt.patient.name} (Status: {appt.status})")
+    return True, "\n".join(lines)
+
+@HOSPITAL_MENUS.action("doctor","2","log_record","Log Medical Record",
+                       [("patient_id","Ente patient ID: "),("diagnosis","Enter diagnosis: "),
+                        ("prescription","Enter prescription: ")])
+def doctor_log_record(hospital,patient_id,diagnosis,prescription):
+    if hospital.log_medical_record(new_id("REC --"),patient_id,diagnosis,prescription,hospital.current_user.person_id):
+        return True, "Medical record logged successfully."
+    return False, "Failed to log medical record."
+
+@HOSPITAL_MENUS.action("doctor","3","patient_history","View Patient Hsitory",[("patient_id","Enter patient ID: ")])
+def doctor_patient_history(hospital,patient_id):
+    patient = hospital.patients.get(patient_id)
+    if not (patient and patient in hospital.current_user.patients_assigned):
+        return False, "Patient not found or not assigned to you."
+    lines = [f"\nMedical History for {patient.name}: "]
+    for kind, entry in patient.timeline.history():
+        if kind == "appointment":
+            lines.append(f"Appointment: {entry.datetime} - {entry.status}")
+        else:
+            lines.append(f"Record: {entry.date}\nDiagnosis: {entry.diagnosis}\nPrescription: {entry.prescription}\n")
+    return True, "\n".join(lines)
+
+@HOSPITAL_MENUS.action("doctor","4","search_records","Search Medical Records",
+                       [("query","Search diagnoses and prescriptions: "),
+                        ("patient_id","Limit to patient ID (blank for all): ")])
+def doctor_search_records(hospital,query,patient_id):
+    results = hospital.search_records(query,patient_id=patient_id or None,limit=50)
+    if not results:
+        return False, "No matching records."
+    return True, "\n".join(f"{record.record_id} - {record.patient.name} ({record.date}): "
+                           f"{record.diagnosis} / {record.prescription}" for record in results)
+
+HOSPITAL_MENUS.action("doctor","5","logout","Logout")(logout)
+
+@HOSPITAL_MENUS.action("receptionist","1","register_patient","Register Patient",
+                       [("name","Patient name: "),("age","Patient age: "),("gender","Patient gender: ")])
+def register_patient(hospital,name,age,gender):
+    patient_id = f"P{len(hospital.patients) + 1:03d}"
+    hospital.add_person("patient",name=name,age=age,gender=gender,person_id=patient_id)
+    return True, f"Patient registered successfully. ID: {patient_id}"
+
+@HOSPITAL_MENUS.action("receptionist","2","book_appointment","Book Appointment",
+                       [("patient_id","Patient ID: "),("doctor_id","Doctor ID: "),
+                        ("datetime_str","Appointment datetime (YYYY-MM-DD HH:MM): ")])
+def book_appointment(hospital,patient_id,doctor_id,datetime_str):
+    if hospital.create_appointment(new_id("APT-"),doctor_id,patient_id,datetime_str):
+        return True, "Appointment booked successfully."
+    slot = hospital.next_free_slot(doctor_id,datetime_str)
+    if slot and patient_id in hospital.patients:
+        return False, f"Failed to book appointment. Doctor's next free slot: {slot:%Y-%m-%d %H:%M}"
+    return False, "Failed to book appointment. Check IDs and datetime format."
+
+@HOSPITAL_MENUS.action("receptionist","3","assign_doctor","Assign Doctor",
+                       [("patient_id","Patient ID: "),("doctor_id","Doctor ID: ")])
+def assign_doctor(hospital,patient_id,doctor_id):
+    if hospital.assign_doctor_to_patient(doctor_id,patient_id):
+        return True, "Doctor assigned successfully."
+    return False, "Failed to assign doctor. Check IDs."
+
+@HOSPITAL_MENUS.action("receptionist","4","cancel_appointment","Cancel Appointment",
+                       [("appointment_id","Appointment ID to cancel: ")])
+def cancel_appointment(hospital,appointment_id):
+    if hospital.update_appointment_status(appointment_id,"Cancelled"):
+        return True, "Appointment cancelled."
+    return False, "Appointment not found."
+
+@HOSPITAL_MENUS.action("receptionist","5","admit_patient","Admit/Transfer Patient to Ward",
+                       [("patient_id","Patient ID: "),("ward","Ward: ")])
+def admit_to_ward(hospital,patient_id,ward):
+    if hospital.admit_patient(patient_id,ward):
+        return True, f"Patient admitted to {ward}."
+    return False, "Failed to admit patient. Check patient ID and ward."
+
+@HOSPITAL_MENUS.action("receptionist","6","discharge_patient","Discharge Patient",[("patient_id","Patient ID: ")])
+def discharge_from_ward(hospital,patient_id):
+    if hospital.discharge_patient(patient_id):
+        return True, "Patient discharged."
+    return False, "Patient not found or not admitted."
+
+HOSPITAL_MENUS.action("receptionist","7","logout","Logout")(logout)
+
+@HOSPITAL_MENUS.action("patient","1","appointments","View My Appointments")
+def patient_appointments(hospital):
+    lines = ["\nYour Appointments:"]
+    for entry in hospital.current_user.timeline.appointments:
+        lines.append(f"{entry.datetime} with Dr. {entry.doctor.name} - {entry.status}")
+    return True, "\n".join(lines)
+
+def describe_records(records):
+    lines = ["\nYour Medical History:"]
+    for entry in records:
+        lines.append(f"\nDate: {entry.date}\nDoctor: Dr. {entry.doctor.name}\n"
+                     f"Diagnosis: {entry.diagnosis}\nPrescription: {entry.prescription}")
+    return True, "\n".join(lines)
+
+@HOSPITAL_MENUS.action("patient","2","history","View My Medical History")
+def patient_history(hospital):
+    return describe_records(hospital.current_user.timeline.records)
+
+@HOSPITAL_MENUS.action("patient","3","recent_records","View Recent Records (last 90 days)")
+def patient_recent_records(hospital):
+    return describe_records(hospital.current_user.timeline.recent_records(90))
+
+HOSPITAL_MENUS.action("patient","4","logout","Logout")(logout)
+
+@HOSPITAL_MENUS.action("nurse","1","ward_patients","View Ward Patients")
+def nurse_ward_patients(hospital):
+    ward = hospital.current_user.assigned_ward
+    lines = [f"\nPatients in {ward}:"]
+    for patient in hospital.get_ward_patients(ward):
+        lines.append(f"{patient.name} (ID: {patient.person_id})")
+    return True, "\n".join(lines)
+
+HOSPITAL_MENUS.action("nurse","2","logout","Logout")(logout)
+
+def seed_doctors(hospital):
     if not hospital.doctors:
         hospital.add_person("doctor",name="Dr. Smith",age=45, gender="Male", person_id = "D001",specialization ="Cardiology")
         hospital.add_person("doctor",name="Dr. Jhonson", age=38, gender="Female",person_id ="D002",specialization ="Pediatrics")
 
-    while True:
-        if not hospital.current_user:
-            print("\nHospital Management System")
-            print("Please log in as:")
-            print("1. Doctor")
-            print("2. Nurse")
-            print("3. Receptionist")
-            print("4. Patient")
-            print("5. Exit")
-
-            choice = input("Enter your choice: ")
-
-            if choice == '1':
-                person_id = input("Enter your doctor ID: ")
-                if person_id in hospital.doctors:
-                    hospital.current_user = hospital.doctors[person_id]
-                    print(f"Welcome Dr. {hospital.current_user.name}!")
-                else:
-                    print("Doctor not found.")
+def run_script(hospital,steps,output=None):
+    # Replays (action, fields) steps without input(), e.g.
+    # ("login.doctor", {"person_id": "D001"}). The action is looked up in the
+    # current user's role, so each step runs exactly as if chosen from the
+    # menu. output(step, success, message) is called per step if given. A bad
+    # step is recorded as failed and the replay carries on.
+    started = time.perf_counter()
+    counts = {"steps": 0, "succeeded": 0, "failed": 0}
+    for step, (action_name, fields) in enumerate(steps):
+        role, _, name = str(action_name).partition(".")
+        action = HOSPITAL_MENUS.by_name.get(role,{}).get(name)
+        current_role = user_role(hospital.current_user)
+        if action_name is None:
+            success, message = False, f"Step has no action: {fields}."
+        elif action is None:
+            success, message = False, f"Unknown action {action_name}."
+        elif role != current_role:
+            success, message = False, f"{action_name} is not available to {current_role}."
+        else:
+            try:
+                success, message = HOSPITAL_MENUS.run(hospital,action,fields)
+            except Exception as e:
+                success, message = False, f"{action_name} failed: {type(e).__name__}: {e}"
+        counts["steps"] += 1
+        counts["succeeded" if success else "failed"] += 1
+        if output is not None:
+            output(step,success,message)
+        if action is not None and action.exits and success:
+            break
+    seconds = time.perf_counter() - started
+    counts["seconds"] = seconds
+    counts["ops_per_sec"] = counts["steps"] / seconds if seconds else 0.0
+    return counts
 
-            elif choice == '2':
-                person_id = input("Enter your nurse ID: ")
-                if person_id in hospital.nurses:
-                    hospital.current_user = hospital.nurses[person_id]
-                    print(f"Welcome Nurse {hospital.current_user.name}!")
-                else:
-                    print("Nurse not found.")
+def read_script(filename):
+    # One JSON object per line: {"action": "receptionist.register_patient", "name": ...}.
+    # Lines that are not JSON objects, or have no action, come through with
+    # action None so run_script records them as failed steps.
+    with open(filename) as f:
+        for line in f:
+            if line.strip():
+                try:
+                    fields = json.loads(line)
+                except ValueError:
+                    fields = {"line": line.strip()}
+                if not isinstance(fields,dict):
+                    fields = {"line": line.strip()}
+                yield fields.pop("action",None), fields
 
-            elif choice == '3':
-                hospital.current_user ={"role": "receptionist"}
-                print("Welcome Receptionist!")
+def hospital_menu(hospital=None):
+    if hospital is None:
+        from hospital_storage import SQLiteStorage
+        hospital = HospitalSystem(SQLiteStorage("hospital_data.db"))
+    seed_doctors(hospital)
 
-            elif choice == '4':
-                person_id = input("Enter your patient ID: ")
-                if person_id in hospital.patients:
-                    hospital.current_user = hospital.patients[person_id]
-                    print(f"Welcome {hospital.current_user.name}!")
-                else:
-                    print("Patient not found.")
-
-            elif choice == '5':
-                hospital.save_data("hospital_data.json")
-                print("Exiting Hospital System.")
-                break
-
-            else:
-                print("Invalid choice.Please try again.")
-
-        elif isinstance(hospital.current_user, Doctor):
-            print("\nDoctor Menu")
-            print("1. View Appointments")
-            print("2. Log Medical Record")
-            print("3. View Patient Hsitory")
-            print("4. Logout")
-
-            choice = input("Enter your choice: ")
-
-            if choice == '1':
-                print("\nYour Appointments: ")
-                for appt in hospital.current_user.schedule:
-                    print(f"{appt.datetime} - {appt.patient.name} (Status: {appt.status})")
-
-            elif choice == '2':
-                patient_id = input("Ente patient ID: ")
-                diagnosis = input("Enter diagnosis: ")
-                prescription = input("Enter prescription: ")
-                record_id = f"REC --{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                if hospital.log_medical_record(record_id,patient_id, diagnosis,prescription,hospital.current_user.person_id):
-                    print("Medical record logged successfully.")
-                else:
-                    print("Failed to log medical record.")
-
-            elif choice =='3':
-                patient_id = input("Enter patient ID: ")
-                patient = hospital.patients.get(patient_id)
-                if patient and patient in hospital.current_user.patients_assigned:
-                    print(f"\nMedical History for {patient.name}: ")
-                    for entry in patient.medical_history:
-                        if isinstance(entry,Appointment):
-                            print(f"Appointment: {entry.datetime} - {entry.status}")
-                        elif isinstance(entry,MedicalRecord):
-                            print(f"Record: {entry.date}\nDiagnosis: {entry.diagnosis}\nPrescription: {entry.prescription}\n")
-                else:
-                    print("Patient not found or not assigned to you.")
-
-            elif choice == '4':
-                hospital.current_user = None
-                print("Logged out successfully.")
-            
-            else:
-                print("Invalid choice. Please try again.")
-
-        elif isinstance(hospital.current_user,dict ) and hospital.current_user.get("role") == "receptionist":
-            print("\nReceptionist Menu")
-            print("1. Register Patient")
-            print("2. Book Appointment")
-            print("3. Assign Doctor")
-            print("4. Cancel Appointment")
-            print("5. Logout")
-            
-            choice = input("Enter your choice: ")
-            
-            if choice == '1':
-                name = input("Patient name: ")
-                age = input("Patient age: ")
-                gender = input("Patient gender: ")
-                patient_id = f"P{len(hospital.patients) + 1:03d}"
-                hospital.add_person("patient", name=name, age=age, gender=gender, person_id=patient_id)
-                print(f"Patient registered successfully. ID: {patient_id}")
-            
-            elif choice == '2':
-                patient_id = input("Patient ID: ")
-                doctor_id = input("Doctor ID: ")
-                datetime_str = input("Appointment datetime (YYYY-MM-DD HH:MM): ")
-                appointment_id = f"APT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                if hospital.create_appointment(appointment_id, doctor_id, patient_id, datetime_str):
-                    print("Appointment booked successfully.")
-                else:
-                    print("Failed to book appointment. Check IDs.")
-            
-            elif choice == '3':
-                patient_id = input("Patient ID: ")
-                doctor_id = input("Doctor ID: ")
-                if hospital.assign_doctor_to_patient(doctor_id, patient_id):
-                    print("Doctor assigned successfully.")
-                else:
-                    print("Failed to assign doctor. Check IDs.")
-            
-            elif choice == '4':
-                appointment_id = input("Appointment ID to cancel: ")
-                appointment = hospital.appointments.get(appointment_id)
-                if appointment:
-                    appointment.add_entry("Cancelled")
-                    print("Appointment cancelled.")
-                else:
-                    print("Appointment not found.")
-            
-            elif choice == '5':
-                hospital.current_user = None
-                print("Logged out successfully.")
-            
-            else:
-                print("Invalid choice. Please try again.")
-        
-        elif isinstance(hospital.current_user, Patient):
-            print("\nPatient Menu")
-            print("1. View My Appointments")
-            print("2. View My Medical History")
-            print("3. Logout")
-            
-            choice = input("Enter your choice: ")
-            
-            if choice == '1':
-                print("\nYour Appointments:")
-                for entry in hospital.current_user.medical_history:
-                    if isinstance(entry, Appointment):
-                        print(f"{entry.datetime} with Dr. {entry.doctor.name} - {entry.status}")
-            
-            elif choice == '2':
-                print("\nYour Medical History:")
-                for entry in hospital.current_user.medical_history:
-                    if isinstance(entry, MedicalRecord):
-                        print(f"\nDate: {entry.date}")
-                        print(f"Doctor: Dr. {entry.doctor.name}")
-                        print(f"Diagnosis: {entry.diagnosis}")
-                        print(f"Prescription: {entry.prescription}")
-            
-            elif choice == '3':
-                hospital.current_user = None
-                print("Logged out successfully.")
-            
-            else:
-                print("Invalid choice. Please try again.")
-        
-        elif isinstance(hospital.current_user, Nurse):
-            print("\nNurse Menu")
-            print("1. View Ward Patients")
-            print("2. Logout")
-            
-            choice = input("Enter your choice: ")
-            
-            if choice == '1':
-                print(f"\nPatients in {hospital.current_user.assigned_ward}:")
-                for patient in hospital.patients.values():
-                    print(f"{patient.name} (ID: {patient.person_id})")
-            
-            elif choice == '2':
-                hospital.current_user = None
-                print("Logged out successfully.")
-            
-            else:
-                print("Invalid choice. Please try again.")
+    while True:
+        role = user_role(hospital.current_user)
+        print(f"\n{HOSPITAL_MENUS.titles[role]}")
+        for option in HOSPITAL_MENUS.options(role):
+            print(option)
+
+        choice = input("Enter your choice: ")
+        action = HOSPITAL_MENUS.by_key[role].get(choice)
+        if action is None:
+            print("Invalid choice. Please try again.")
+            continue
+
+        fields = {name: input(prompt) for name, prompt in action.prompts}
+        _, message = HOSPITAL_MENUS.run(hospital,action,fields)
+        print(message)
+        if action.exits:
+            break
 
 if __name__ == "__main__":
-    hospital_menu()
\ No newline at end of file
+    # Run through the importable module: hospital_storage imports
+    # hospital_management, and objects it loads must be the same classes the
+    # menu checks against, not copies defined under __main__.
+    import hospital_management
+    if len(sys.argv) > 1:
+        # Batch mode: python hospital_management.py script.jsonl [--quiet]
+        hospital = hospital_management.HospitalSystem()
+        hospital_management.seed_doctors(hospital)
+        quiet = "--quiet" in sys.argv[2:]
+        stats = hospital_management.run_script(hospital,hospital_management.read_script(sys.argv[1]),
+                                               None if quiet else lambda step, success, message: print(message))
+        print(f"{stats['steps']} steps ({stats['failed']} failed) in {stats['seconds']:.3f}s, "
+              f"{stats['ops_per_sec']:,.0f} ops/s")
+    else:
+        hospital_management.hospital_menu()
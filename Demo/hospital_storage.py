@@ -0,0 +1,448 @@
+import json
+import sqlite3
+from hospital_management import (Patient, Doctor, Nurse, Appointment, MedicalRecord, DoctorSchedule,
+                                 PatientTimeline, JsonSectionReader, LoadProgress, tokenize,
+                                 parse_appointment_time, format_appointment_time)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    person_id TEXT PRIMARY KEY,
+    name TEXT,
+    age,
+    gender TEXT,
+    symptoms TEXT,
+    assigned_doctor_id TEXT,
+    ward TEXT
+);
+CREATE INDEX IF NOT EXISTS patients_by_doctor ON patients (assigned_doctor_id);
+
+CREATE TABLE IF NOT EXISTS doctors (
+    person_id TEXT PRIMARY KEY,
+    name TEXT,
+    age,
+    gender TEXT,
+    specialization TEXT
+);
+
+CREATE TABLE IF NOT EXISTS nurses (
+    person_id TEXT PRIMARY KEY,
+    name TEXT,
+    age,
+    gender TEXT,
+    assigned_ward TEXT,
+    shift_time TEXT
+);
+CREATE INDEX IF NOT EXISTS nurses_by_ward ON nurses (assigned_ward);
+
+CREATE TABLE IF NOT EXISTS appointments (
+    appointment_id TEXT PRIMARY KEY,
+    doctor_id TEXT,
+    patient_id TEXT,
+    datetime TEXT,
+    status TEXT,
+    duration INTEGER DEFAULT 30
+);
+CREATE INDEX IF NOT EXISTS appointments_by_doctor ON appointments (doctor_id);
+CREATE INDEX IF NOT EXISTS appointments_by_patient ON appointments (patient_id);
+
+CREATE TABLE IF NOT EXISTS records (
+    record_id TEXT PRIMARY KEY,
+    patient_id TEXT,
+    doctor_id TEXT,
+    diagnosis TEXT,
+    prescription TEXT,
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS records_by_patient ON records (patient_id);
+CREATE INDEX IF NOT EXISTS records_by_doctor ON records (doctor_id);
+"""
+
+# Columns added after the first release of the schema, with their types.
+# Older database files get them added on open.
+ADDED_COLUMNS = {
+    "appointments": [("duration","INTEGER DEFAULT 30")],
+    "patients": [("ward","TEXT")],
+}
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS patients_by_ward ON patients (ward);
+"""
+
+# External-content full-text index over records, kept in sync by triggers so
+# every write path (including bulk import) updates it.
+FULL_TEXT_SCHEMA = """
+CREATE VIRTUAL TABLE records_fts USING fts5(diagnosis, prescription, content='records', content_rowid='rowid');
+CREATE TRIGGER records_fts_insert AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts (rowid, diagnosis, prescription) VALUES (new.rowid, new.diagnosis, new.prescription);
+END;
+CREATE TRIGGER records_fts_delete AFTER DELETE ON records BEGIN
+    INSERT INTO records_fts (records_fts, rowid, diagnosis, prescription)
+    VALUES ('delete', old.rowid, old.diagnosis, old.prescription);
+END;
+CREATE TRIGGER records_fts_update AFTER UPDATE ON records BEGIN
+    INSERT INTO records_fts (records_fts, rowid, diagnosis, prescription)
+    VALUES ('delete', old.rowid, old.diagnosis, old.prescription);
+    INSERT INTO records_fts (rowid, diagnosis, prescription) VALUES (new.rowid, new.diagnosis, new.prescription);
+END;
+INSERT INTO records_fts (records_fts) VALUES ('rebuild');
+"""
+
+class LazyList(list):
+    # A list that fetches its contents from storage the first time it is used,
+    # so loading a doctor does not pull in every appointment and patient
+    # reachable from them.
+    def __init__(self,loader):
+        super().__init__()
+        self.loader = loader
+
+    def load(self):
+        if self.loader is not None:
+            loader, self.loader = self.loader, None
+            super().extend(loader())
+        return self
+
+def _loading(name):
+    method = getattr(list,name)
+    def wrapper(self,*args):
+        self.load()
+        return method(self,*args)
+    wrapper.__name__ = name
+    return wrapper
+
+for _name in ("__iter__","__len__","__getitem__","__setitem__","__delitem__","__contains__","__reversed__",
+              "__repr__","__eq__","__iadd__","append","extend","insert","remove","pop","clear","index","count",
+              "sort","reverse","copy"):
+    setattr(LazyList,_name,_loading(_name))
+
+class StoredMap:
+    # Dict-like view over one table. Objects are built on first access and
+    # cached, so the same id always maps to the same object.
+    def __init__(self,storage,table,key,loader):
+        self.storage = storage
+        self.table = table
+        self.key = key
+        self.loader = loader
+        self.cache = {}
+
+    def get(self,key,default=None):
+        item = self.cache.get(key)
+        if item is None:
+            item = self.loader(key)
+            if item is None:
+                return default
+            self.cache[key] = item
+        return item
+
+    def __getitem__(self,key):
+        item = self.get(key)
+        if item is None:
+            raise KeyError(key)
+        return item
+
+    def __setitem__(self,key,item):
+        self.cache[key] = item
+
+    def __contains__(self,key):
+        return key in self.cache or self.storage.exists(self.table,self.key,key)
+
+    def __len__(self):
+        return self.storage.count(self.table)
+
+    def __iter__(self):
+        return self.storage.keys(self.table,self.key)
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        return (self[key] for key in self)
+
+    def items(self):
+        return ((key,self[key]) for key in self)
+
+class SQLiteStorage:
+    def __init__(self,filename):
+        self.connection = sqlite3.connect(filename)
+        # WAL with synchronous=NORMAL keeps a commit per change cheap.
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.__add_missing_columns()
+        self.connection.executescript(INDEXES)
+        if not self.exists("sqlite_master","name","records_fts"):
+            self.connection.executescript(FULL_TEXT_SCHEMA)
+        self.system = None
+
+    def __add_missing_columns(self):
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in columns:
+                if column not in existing:
+                    self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        self.connection.commit()
+
+    def attach(self,system):
+        self.system = system
+        system.patients = StoredMap(self,"patients","person_id",self.load_patient)
+        system.doctors = StoredMap(self,"doctors","person_id",self.load_doctor)
+        system.nurses = StoredMap(self,"nurses","person_id",self.load_nurse)
+        system.appointments = StoredMap(self,"appointments","appointment_id",self.load_appointment)
+        system.records = StoredMap(self,"records","record_id",self.load_record)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def exists(self,table,key_column,key):
+        return self.connection.execute(f"SELECT 1 FROM {table} WHERE {key_column} = ?",(key,)).fetchone() is not None
+
+    def count(self,table):
+        return self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def keys(self,table,key_column):
+        return iter([row[0] for row in self.connection.execute(f"SELECT {key_column} FROM {table} ORDER BY rowid")])
+
+    # Writes. HospitalSystem calls these after updating its objects, so a
+    # lazy list that is loaded during the update never sees the new row.
+
+    def save_person(self,person_type,person):
+        if person_type == "patient":
+            doctor_id = person.assigned_doctor.person_id if person.assigned_doctor else None
+            self.__upsert("patients","person_id",
+                          ("person_id","name","age","gender","symptoms","assigned_doctor_id","ward"),
+                          (person.person_id,person.name,person.age,person.gender,json.dumps(person.symptoms),doctor_id,
+                           person.ward))
+        elif person_type == "doctor":
+            self.__upsert("doctors","person_id",("person_id","name","age","gender","specialization"),
+                          (person.person_id,person.name,person.age,person.gender,person.specialization))
+        elif person_type == "nurse":
+            self.__upsert("nurses","person_id",("person_id","name","age","gender","assigned_ward","shift_time"),
+                          (person.person_id,person.name,person.age,person.gender,person.assigned_ward,person.shift_time))
+
+    def save_patient_doctor(self,patient):
+        self.connection.execute("UPDATE patients SET assigned_doctor_id = ? WHERE person_id = ?",
+                                (patient.assigned_doctor.person_id,patient.person_id))
+        self.connection.commit()
+
+    def save_patient_ward(self,patient):
+        self.connection.execute("UPDATE patients SET ward = ? WHERE person_id = ?",(patient.ward,patient.person_id))
+        self.connection.commit()
+
+    def ward_patient_ids(self,ward):
+        return [row[0] for row in self.connection.execute(
+            "SELECT person_id FROM patients WHERE ward = ? ORDER BY rowid",(ward,))]
+
+    def search_record_ids(self,text,patient_id=None,doctor_id=None,prefix=True,limit=None):
+        terms = tokenize(text)
+        if terms:
+            match = " ".join(f'"{term}"*' if prefix else f'"{term}"' for term in terms)
+            sql = ("SELECT records.record_id FROM records_fts JOIN records ON records.rowid = records_fts.rowid "
+                   "WHERE records_fts MATCH ?")
+            params = [match]
+        else:
+            sql = "SELECT record_id FROM records WHERE 1"
+            params = []
+        if patient_id is not None:
+            sql += " AND records.patient_id = ?"
+            params.append(patient_id)
+        if doctor_id is not None:
+            sql += " AND records.doctor_id = ?"
+            params.append(doctor_id)
+        if not terms and len(params) == 0:
+            return []
+        sql += " ORDER BY records.rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self.connection.execute(sql,params)]
+
+    def save_appointment(self,appointment):
+        self.__upsert("appointments","appointment_id",
+                      ("appointment_id","doctor_id","patient_id","datetime","status","duration"),
+                      (appointment.appointment_id,appointment.doctor.person_id,appointment.patient.person_id,
+                       appointment.datetime,appointment.status,appointment.duration))
+
+    def save_record(self,record):
+        self.__upsert("records","record_id",("record_id","patient_id","doctor_id","diagnosis","prescription","date"),
+                      (record.record_id,record.patient.person_id,record.doctor.person_id,
+                       record.diagnosis,record.prescription,record.date))
+
+    # An upsert rather than INSERT OR REPLACE keeps the row's rowid, which is
+    # what the lazy lists order by.
+    def __upsert(self,table,key_column,columns,values):
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != key_column)
+        self.connection.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT ({key_column}) DO UPDATE SET {updates}",values)
+        self.connection.commit()
+
+    # Bulk import of a save_data export. Rows go straight from the stream into
+    # the tables in batches without building objects, so memory stays flat
+    # however big the file is. The tables' primary keys act as the id index
+    # for the second pass, which only keeps references whose doctor and
+    # patient exist.
+    def import_json(self,filename,progress=None,report_every=10000,batch_size=5000):
+        reader = JsonSectionReader(filename)
+        tracker = LoadProgress(progress,report_every)
+        statements = {
+            "patients": "INSERT OR IGNORE INTO patients (person_id, name, age, gender, symptoms, ward) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+            "doctors": "INSERT OR IGNORE INTO doctors VALUES (?, ?, ?, ?, ?)",
+            "nurses": "INSERT OR IGNORE INTO nurses VALUES (?, ?, ?, ?, ?, ?)",
+            "assignments": "UPDATE patients SET assigned_doctor_id = ? WHERE person_id = ? "
+                           "AND EXISTS (SELECT 1 FROM doctors WHERE person_id = ?)",
+            "appointments": "INSERT OR IGNORE INTO appointments SELECT ?, ?, ?, ?, ?, ? "
+                            "WHERE EXISTS (SELECT 1 FROM doctors WHERE person_id = ?) "
+                            "AND EXISTS (SELECT 1 FROM patients WHERE person_id = ?)",
+            "records": "INSERT OR IGNORE INTO records SELECT ?, ?, ?, ?, ?, ? "
+                       "WHERE EXISTS (SELECT 1 FROM patients WHERE person_id = ?) "
+                       "AND EXISTS (SELECT 1 FROM doctors WHERE person_id = ?)",
+        }
+        batches = {name: [] for name in statements}
+
+        def add(name,row):
+            batch = batches[name]
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self.connection.executemany(statements[name],batch)
+                batch.clear()
+
+        def flush():
+            for name, batch in batches.items():
+                if batch:
+                    self.connection.executemany(statements[name],batch)
+                    batch.clear()
+            self.connection.commit()
+
+        try:
+            for section, _, d in reader:
+                if section == "patients":
+                    add("patients",(d["person_id"],d["name"],d["age"],d["gender"],json.dumps(d.get("symptoms",[])),
+                                    d.get("ward")))
+                elif section == "doctors":
+                    add("doctors",(d["person_id"],d["name"],d["age"],d["gender"],d["specialization"]))
+                elif section == "nurses":
+                    add("nurses",(d["person_id"],d["name"],d["age"],d["gender"],d["assigned_ward"],d["shift_time"]))
+                else:
+                    continue
+                tracker.tick(section,reader)
+            flush()
+
+            for section, _, d in reader:
+                if section == "patients":
+                    if d.get("assigned_doctor_id"):
+                        add("assignments",(d["assigned_doctor_id"],d["person_id"],d["assigned_doctor_id"]))
+                    continue
+                elif section == "appointments":
+                    # Stored in canonical form; a time that does not parse is
+                    # skipped, as the in-memory load_data does.
+                    try:
+                        when = format_appointment_time(parse_appointment_time(d["datetime"]))
+                    except (ValueError, TypeError):
+                        continue
+                    add("appointments",(d["appointment_id"],d["doctor_id"],d["patient_id"],when,d["status"],
+                                        d.get("duration",30),d["doctor_id"],d["patient_id"]))
+                elif section == "records":
+                    add("records",(d["record_id"],d["patient_id"],d["doctor_id"],d["diagnosis"],d["prescription"],
+                                   d["date"],d["patient_id"],d["doctor_id"]))
+                else:
+                    continue
+                tracker.tick(section,reader)
+            flush()
+        except FileNotFoundError:
+            pass
+        return tracker.stats(reader)
+
+    # Loads. Relationship collections fill themselves on first use, so
+    # building one object never cascades into loading the rest of the hospital.
+
+    def load_patient(self,person_id):
+        row = self.connection.execute(
+            "SELECT name, age, gender, symptoms, assigned_doctor_id, ward FROM patients WHERE person_id = ?",
+            (person_id,)).fetchone()
+        if row is None:
+            return None
+        name, age, gender, symptoms, doctor_id, ward = row
+        patient = Patient(name,age,gender,person_id)
+        patient.symptoms = json.loads(symptoms)
+        patient.ward = ward
+        patient.timeline = PatientTimeline(
+            lambda: [(a.start,a) for a in self.__appointments("patient_id",person_id)],
+            lambda: [(r.date,r) for r in self.__records("patient_id",person_id)])
+        if doctor_id:
+            patient.assigned_doctor = self.system.doctors.get(doctor_id)
+        return patient
+
+    def load_doctor(self,person_id):
+        row = self.connection.execute(
+            "SELECT name, age, gender, specialization FROM doctors WHERE person_id = ?",(person_id,)).fetchone()
+        if row is None:
+            return None
+        name, age, gender, specialization = row
+        doctor = Doctor(name,age,gender,person_id,specialization)
+        doctor.schedule = DoctorSchedule(lambda: self.__appointments("doctor_id",person_id))
+        doctor.patients_assigned = LazyList(lambda: [
+            self.system.patients[patient_id] for (patient_id,) in self.connection.execute(
+                "SELECT person_id FROM patients WHERE assigned_doctor_id = ? ORDER BY rowid",(person_id,))])
+        return doctor
+
+    def load_nurse(self,person_id):
+        row = self.connection.execute(
+            "SELECT name, age, gender, assigned_ward, shift_time FROM nurses WHERE person_id = ?",
+            (person_id,)).fetchone()
+        if row is None:
+            return None
+        name, age, gender, assigned_ward, shift_time = row
+        return Nurse(name,age,gender,person_id,assigned_ward,shift_time)
+
+    def load_appointment(self,appointment_id):
+        row = self.connection.execute(
+            "SELECT appointment_id, doctor_id, patient_id, datetime, status, duration FROM appointments "
+            "WHERE appointment_id = ?",
+            (appointment_id,)).fetchone()
+        return self.__appointment_from_row(row) if row else None
+
+    def load_record(self,record_id):
+        row = self.connection.execute(
+            "SELECT record_id, patient_id, doctor_id, diagnosis, prescription, date FROM records WHERE record_id = ?",
+            (record_id,)).fetchone()
+        return self.__record_from_row(row) if row else None
+
+    def __appointments(self,column,value):
+        rows = self.connection.execute(
+            f"SELECT appointment_id, doctor_id, patient_id, datetime, status, duration FROM appointments "
+            f"WHERE {column} = ? ORDER BY rowid",(value,)).fetchall()
+        appointments = (self.system.appointments.cache.get(row[0]) or self.__cache_appointment(row) for row in rows)
+        return [appointment for appointment in appointments if appointment is not None]
+
+    def __records(self,column,value):
+        rows = self.connection.execute(
+            f"SELECT record_id, patient_id, doctor_id, diagnosis, prescription, date FROM records "
+            f"WHERE {column} = ? ORDER BY rowid",(value,)).fetchall()
+        return [self.system.records.cache.get(row[0]) or self.__cache_record(row) for row in rows]
+
+    def __cache_appointment(self,row):
+        appointment = self.__appointment_from_row(row)
+        if appointment is not None:
+            self.system.appointments[appointment.appointment_id] = appointment
+        return appointment
+
+    def __cache_record(self,row):
+        record = self.__record_from_row(row)
+        self.system.records[record.record_id] = record
+        return record
+
+    # Rows written before datetimes were validated may not parse; they are
+    # skipped rather than breaking every schedule that would include them.
+    def __appointment_from_row(self,row):
+        appointment_id, doctor_id, patient_id, datetime, status, duration = row
+        try:
+            return Appointment(appointment_id,self.system.doctors[doctor_id],self.system.patients[patient_id],
+                               datetime,status,duration)
+        except (ValueError, TypeError):
+            return None
+
+    def __record_from_row(self,row):
+        record_id, patient_id, doctor_id, diagnosis, prescription, date = row
+        return MedicalRecord(record_id,self.system.patients[patient_id],diagnosis,prescription,
+                             self.system.doctors[doctor_id],date)
@@ -0,0 +1,159 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Snowflake-style 63-bit ids: milliseconds since EPOCH_MS, then a node id,
+# then a per-millisecond sequence. Ids from one generator always increase,
+# and two generators can only collide if they share a node id, so every live
+# process must hold its own: one leased from NODE_DIR, or one assigned in
+# DEMO_NODE_ID, which is leased too so a second holder fails loudly.
+EPOCH_MS = 1_767_225_600_000  # 2026-01-01 00:00 UTC
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+NODE_DIR = os.environ.get("DEMO_NODE_DIR",os.path.join(tempfile.gettempdir(),"demo_id_nodes"))
+
+class NodeConflict(RuntimeError):
+    pass
+
+# Lease files held by this process, node -> open descriptor. A lease is an
+# exclusive OS lock on the node's file in NODE_DIR, not the file itself: the
+# kernel drops the lock when its holder dies, so there is no stale lease to
+# detect or take over. The files are never deleted, since a process could be
+# waiting to lock one that another process is about to unlink.
+leases = {}
+
+def lock_file(fd):
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd,fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd,msvcrt.LK_NBLCK,1)
+    except OSError:
+        return False
+    return True
+
+def claim_node(node):
+    fd = os.open(os.path.join(NODE_DIR,f"node-{node}"),os.O_CREAT | os.O_RDWR,0o644)
+    if not lock_file(fd):
+        os.close(fd)
+        return False
+    # The pid is only there for people inspecting NODE_DIR.
+    os.ftruncate(fd,0)
+    os.write(fd,str(os.getpid()).encode())
+    leases[node] = fd
+    return True
+
+def lease_node(first):
+    os.makedirs(NODE_DIR,exist_ok=True)
+    for offset in range(MAX_NODE + 1):
+        node = (first + offset) & MAX_NODE
+        if claim_node(node):
+            return node
+    raise NodeConflict(f"all {MAX_NODE + 1} node ids in {NODE_DIR} are leased by live processes")
+
+def configured_node_id():
+    node = os.environ.get("DEMO_NODE_ID")
+    return None if node is None else int(node) & MAX_NODE
+
+def default_node_id():
+    node = configured_node_id()
+    if node is None:
+        return lease_node(os.getpid())
+    os.makedirs(NODE_DIR,exist_ok=True)
+    if not claim_node(node):
+        raise NodeConflict(f"node id {node} (DEMO_NODE_ID) is already in use by another live process")
+    return node
+
+class IdGenerator:
+    def __init__(self,node_id=None,epoch_ms=EPOCH_MS):
+        self.node_id = (default_node_id() if node_id is None else node_id) & MAX_NODE
+        self.epoch_ms = epoch_ms
+        self.last_ms = -1
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def next_id(self):
+        with self.lock:
+            now = time.time_ns() // 1_000_000
+            if now <= self.last_ms:
+                # Same millisecond, or the clock stepped backwards: keep counting
+                # in the last millisecond used. When its sequence runs out, wait
+                # for the clock to move past it; borrowing future milliseconds
+                # would let a quickly restarted process issue the same ids.
+                self.sequence = (self.sequence + 1) & MAX_SEQUENCE
+                if self.sequence == 0:
+                    while now <= self.last_ms:
+                        time.sleep(0.0001)
+                        now = time.time_ns() // 1_000_000
+                else:
+                    now = self.last_ms
+            else:
+                self.sequence = 0
+            self.last_ms = now
+            return ((now - self.epoch_ms) << (NODE_BITS + SEQUENCE_BITS)) | (self.node_id << SEQUENCE_BITS) | self.sequence
+
+# Created on the first new_id(), so importing a module that uses ids does not
+# touch NODE_DIR.
+shared_generator = None
+shared_lock = threading.Lock()
+
+def get_shared_generator():
+    global shared_generator
+    if shared_generator is None:
+        with shared_lock:
+            if shared_generator is None:
+                shared_generator = IdGenerator()
+    return shared_generator
+
+def reset_after_fork():
+    # A forked child would otherwise keep its parent's node id and repeat its
+    # ids. It drops the lease descriptors it inherited and leases the next
+    # free node after the configured one (or after its parent's). The locks
+    # are replaced too, in case another thread held one at fork.
+    global shared_lock
+    shared_lock = threading.Lock()
+    for fd in leases.values():
+        os.close(fd)
+    leases.clear()
+    if shared_generator is not None:
+        shared_generator.lock = threading.Lock()
+        base = configured_node_id()
+        shared_generator.node_id = lease_node((shared_generator.node_id if base is None else base) + 1)
+
+if hasattr(os,"register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
+
+def new_id(prefix=""):
+    return f"{prefix}{get_shared_generator().next_id()}"
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    thread_count = 4
+    batches = [[] for _ in range(thread_count)]
+
+    def issue(batch):
+        next_id = get_shared_generator().next_id
+        for _ in range(count // thread_count):
+            batch.append(next_id())
+
+    threads = [threading.Thread(target=issue,args=(batch,)) for batch in batches]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    issued = sum(len(batch) for batch in batches)
+    unique = len(set().union(*batches))
+    print(f"{issued:,} ids from {thread_count} threads in {elapsed:.2f}s ({issued / elapsed:,.0f}/s), {issued - unique} duplicates")
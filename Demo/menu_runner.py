@@ -0,0 +1,164 @@
+import builtins
+import importlib
+import os
+import re
+import sys
+import tempfile
+import time
+
+# Replays a recorded script of answers (one input() answer per line) through
+# any of the Demo menus without a terminal. Output is swallowed, and every
+# menu choice is timed from the moment it is entered until the menu asks for
+# the next choice, labelled with the option text the menu printed for it.
+sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+
+MENUS = {
+    "airway": ("airway_system_main","main"),
+    "bank": ("bank_account_management_system","bank_menu"),
+    "ecommerce": ("ecommerce_shopping","ecommerce_menu"),
+    "hospital": ("hospital_management","hospital_menu"),
+    "library": ("library_management_system","library_menu"),
+    "parking": ("parking_lot_management","parking_lot_menu"),
+    "tasks": ("task_tracker_main","main"),
+}
+
+CHOICE_PROMPT = re.compile(r"enter (your )?choice",re.IGNORECASE)
+OPTION_LINE = re.compile(r"^\s*(\d+)\.\s+(.+?)\s*$")
+
+class ScriptExhausted(BaseException):
+    # A BaseException so that a menu's own "except Exception" cannot swallow it.
+    pass
+
+def read_script(filename):
+    with open(filename) as f:
+        return [line.rstrip("\n") for line in f]
+
+def percentile(ordered,fraction):
+    return ordered[min(len(ordered) - 1,int(fraction * len(ordered)))]
+
+class MenuRun:
+    def __init__(self,answers,echo=False):
+        self.answers = answers
+        self.position = 0
+        self.echo = echo
+        self.printed = []
+        self.latencies = {}
+        self.current = None
+        self.started = None
+        self.incomplete = False
+        self.error = None
+
+    def print(self,*args,sep=" ",end="\n",file=None,flush=False):
+        text = sep.join(str(arg) for arg in args)
+        self.printed.extend(text.split("\n"))
+        if self.echo:
+            self.real_print(*args,sep=sep,end=end,file=file,flush=flush)
+
+    def label(self,choice):
+        # The menu is the last block of "N. Option" lines printed before the
+        # prompt (earlier blocks belong to the previous action's output). Its
+        # heading is the closest title line above it, skipping "Log in as:"
+        # style lead-ins.
+        lines = [line.strip() for line in self.printed if line.strip()]
+        end = len(lines)
+        while end and not OPTION_LINE.match(lines[end - 1]):
+            end -= 1
+        start = end
+        while start and OPTION_LINE.match(lines[start - 1]):
+            start -= 1
+        options = dict(OPTION_LINE.match(line).groups() for line in lines[start:end])
+        titles = lines[max(0,start - 2):start]
+        heading = next((title for title in reversed(titles) if not title.endswith(":")),titles[-1] if titles else None)
+        option = options.get(choice.strip(),"invalid choice")
+        return f"{heading.strip(' =-')} / {option}" if heading else option
+
+    def finish_action(self):
+        if self.current is not None:
+            self.latencies.setdefault(self.current,[]).append(time.perf_counter() - self.started)
+            self.current = None
+
+    def input(self,prompt=""):
+        is_choice = CHOICE_PROMPT.search(str(prompt)) is not None
+        if is_choice:
+            self.finish_action()
+        if self.position >= len(self.answers):
+            # Running out mid-action leaves that action unmeasured.
+            self.incomplete = self.current is not None
+            raise ScriptExhausted()
+        answer = self.answers[self.position]
+        self.position += 1
+        if is_choice:
+            self.current = self.label(answer)
+            self.printed = []
+            self.started = time.perf_counter()
+        return answer
+
+    def run(self,menu):
+        self.real_print = builtins.print
+        real_input = builtins.input
+        builtins.print, builtins.input = self.print, self.input
+        try:
+            menu()
+            self.finish_action()
+        except SystemExit:
+            self.finish_action()
+        except ScriptExhausted:
+            self.current = None
+        except Exception as e:
+            self.current = None
+            self.error = f"{type(e).__name__}: {e} (after answer {self.position})"
+        finally:
+            builtins.print, builtins.input = self.real_print, real_input
+        return self
+
+def run_menu(name,answers,repeat=1,echo=False):
+    # Each repetition starts the menu afresh in an empty directory, so menus
+    # that persist state (bank journal, hospital database) start clean and
+    # never touch the real data files.
+    module_name, function_name = MENUS[name]
+    menu = getattr(importlib.import_module(module_name),function_name)
+    latencies = {}
+    runs = []
+    original_directory = os.getcwd()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                run = MenuRun(answers,echo).run(menu)
+            finally:
+                os.chdir(original_directory)
+        runs.append(run)
+        for label, samples in run.latencies.items():
+            latencies.setdefault(label,[]).extend(samples)
+    return {
+        "menu": name,
+        "seconds": time.perf_counter() - start,
+        "actions": sum(len(samples) for samples in latencies.values()),
+        "latencies": latencies,
+        "errors": [run.error for run in runs if run.error],
+        "incomplete": sum(1 for run in runs if run.incomplete),
+    }
+
+def report(result):
+    seconds = result["seconds"]
+    print(f"{result['menu']}: {result['actions']:,} actions in {seconds:.3f}s "
+          f"({result['actions'] / seconds if seconds else 0:,.0f} actions/s)")
+    print(f"{'action':<50} {'count':>8} {'ops/s':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, samples in sorted(result["latencies"].items(),key=lambda item: -len(item[1])):
+        ordered = sorted(samples)
+        total = sum(ordered)
+        print(f"{label[:50]:<50} {len(ordered):>8,} {len(ordered) / total if total else 0:>10,.0f} "
+              f"{percentile(ordered,0.5) * 1000:>8.3f} {percentile(ordered,0.9) * 1000:>8.3f} "
+              f"{percentile(ordered,0.99) * 1000:>8.3f} {ordered[-1] * 1000:>8.3f}")
+    if result["incomplete"]:
+        print(f"{result['incomplete']} run(s) ran out of script in the middle of an action")
+    for error in result["errors"]:
+        print(f"error: {error}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in MENUS:
+        print(f"usage: python menu_runner.py {{{'|'.join(MENUS)}}} script.txt [--repeat N] [--echo]")
+        sys.exit(1)
+    repeat = int(sys.argv[sys.argv.index("--repeat") + 1]) if "--repeat" in sys.argv else 1
+    report(run_menu(sys.argv[1],read_script(sys.argv[2]),repeat,"--echo" in sys.argv))
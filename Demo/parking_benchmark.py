@@ -0,0 +1,197 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import parking_pricing
+from parking_lot_management import ParkingLot, GarageCoordinator, Level, load_layout, Bike, Car, Truck
+from parking_pricing import PricingEngine
+
+VEHICLES = (Bike,Car,Truck)
+
+def scan_for_spot(lot,vehicle_type):
+    # The original linear search, kept as the reference implementation.
+    for spot in lot.spots.values():
+        if spot.vehicle_type == vehicle_type and spot.is_available:
+            return spot
+    return None
+
+def rush_hour(lot,arrivals,seed=0,capacity=None):
+    # Fill the lot to about 90%, then alternate arrivals and departures so
+    # every arrival has to find one of the few remaining free spots.
+    capacity = capacity or len(lot.spots)
+    rng = random.Random(seed)
+    parked = []
+    start = time.perf_counter()
+    for i in range(arrivals):
+        vehicle = VEHICLES[i % 3](f"PLATE{i}")
+        if lot.park_vehicle(vehicle):
+            parked.append(vehicle.license_plate)
+        if len(parked) > capacity * 0.9:
+            plate = parked.pop(rng.randrange(len(parked)))
+            lot.release_vehicle(plate)
+    return arrivals / (time.perf_counter() - start)
+
+def benchmark_spot_search(spots_per_type,lookups=2_000):
+    lot = ParkingLot(spots_per_type)
+    # Occupy everything except the spot farthest from the entrance.
+    for i in range(spots_per_type * 3 - 3):
+        lot.park_vehicle(VEHICLES[i % 3](f"FILL{i}"))
+    results = {"spots": len(lot.spots)}
+    # The scan walks every spot per lookup, so it gets fewer lookups on big lots.
+    scan_lookups = max(3,min(lookups,3_000_000 // len(lot.spots)))
+    for name, find, count in (("scan",lambda t: scan_for_spot(lot,t),scan_lookups),("pool",lot.find_available_spot,lookups)):
+        start = time.perf_counter()
+        for i in range(count):
+            spot = find(VEHICLES[i % 3](f"X{i}").vehicle_type)
+        results[f"{name}_per_sec"] = count / (time.perf_counter() - start)
+        spot = find("truck")
+        results[f"{name}_spot"] = spot.spot_id if spot else None
+    return results
+
+def benchmark_exit_latency(history_sizes,spots_per_type=1_000,exits=1_000):
+    # Exit time after history_size tickets have already been issued and
+    # closed. Exits are timed one by one: the median is the steady-state cost,
+    # while the max also catches the archive dict's occasional resize.
+    results = []
+    for history in history_sizes:
+        lot = ParkingLot(spots_per_type)
+        for i in range(history):
+            vehicle = VEHICLES[i % 3](f"OLD{i}")
+            lot.park_vehicle(vehicle)
+            lot.release_vehicle(vehicle.license_plate)
+        for i in range(exits):
+            lot.park_vehicle(VEHICLES[i % 3](f"NOW{i}"))
+        timings = []
+        for i in range(exits):
+            start = time.perf_counter()
+            lot.release_vehicle(f"NOW{i}")
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results.append((history,len(lot.tickets),timings[len(timings) // 2] * 1e6,timings[-1] * 1e6))
+    return results
+
+def benchmark_report(spots_per_type,polls=10_000):
+    lot = ParkingLot(spots_per_type)
+    rush_hour(lot,spots_per_type * 3)
+    start = time.perf_counter()
+    for _ in range(polls):
+        lot.generate_report()
+    report_us = (time.perf_counter() - start) / polls * 1e6
+    start = time.perf_counter()
+    lot.recount()
+    recount_us = (time.perf_counter() - start) * 1e6
+    consistent, _ = lot.verify_counters()
+    return report_us, recount_us, consistent
+
+def build_layout(garages,levels,spots_per_level):
+    # Each level: a near zone of bikes and trucks and two car zones behind it.
+    share = spots_per_level // 10
+    zones = [
+        {"name": "Entrance", "distance": 0, "spots": {"bike": share, "truck": share}},
+        {"name": "A", "distance": 1_000, "spots": {"car": share * 4}},
+        {"name": "B", "distance": 5_000, "spots": {"car": spots_per_level - share * 6}},
+    ]
+    return {"garages": [{"name": f"G{g + 1}", "levels": [{"name": f"L{l + 1}", "zones": zones} for l in range(levels)]}
+                        for g in range(garages)]}
+
+def load_built_layout(layout):
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory,"layout.json")
+        with open(filename,"w") as f:
+            json.dump(layout,f)
+        return load_layout(filename)
+
+def benchmark_spot_memory(spots):
+    # Bytes per spot for the flat level arrays against one attribute object
+    # per spot, as the lot used to keep.
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    level = Level("L1",build_layout(1,1,spots)["garages"][0]["levels"][0]["zones"])
+    flat = (tracemalloc.get_traced_memory()[0] - before) / len(level)
+    before = tracemalloc.get_traced_memory()[0]
+    objects = {f"C{i}": SimpleNamespace(spot_id=f"C{i}",vehicle_type="car",is_available=True,current_vehicle=None)
+               for i in range(spots)}
+    per_object = (tracemalloc.get_traced_memory()[0] - before) / len(objects)
+    tracemalloc.stop()
+    return flat, per_object
+
+def benchmark_coordinator(garages,levels,spots_per_level):
+    lots = load_built_layout(build_layout(garages,levels,spots_per_level))
+    capacity = sum(len(lot.spots) for lot in lots)
+    coordinator = GarageCoordinator(lots)
+    parks_per_sec = rush_hour(coordinator,min(capacity * 2,200_000),capacity=capacity)
+    consistent, _ = coordinator.verify_counters()
+    return capacity, parks_per_sec, consistent
+
+SAMPLE_TARIFFS = {
+    "bike": {"tiers": [[1,0.5],[4,1.5],[24,3.0]], "grace_minutes": 15},
+    "car": {"rate": 1.0, "peak": [{"start": "07:00", "end": "10:00", "rate": 2.5}], "daily_cap": 18.0,
+            "grace_minutes": 10},
+    "truck": {"rate": 2.0, "peak": [{"start": "22:00", "end": "06:00", "rate": 1.0}], "daily_cap": 30.0},
+}
+
+def day_of_exits(count,seed=0):
+    rng = random.Random(seed)
+    day = datetime(2026,1,5)
+    types, entries, exits = [], [], []
+    for i in range(count):
+        exit_time = day + timedelta(seconds=rng.randrange(86_400))
+        types.append(VEHICLES[i % 3].__name__.lower())
+        entries.append(exit_time - timedelta(seconds=rng.randrange(3 * 86_400)))
+        exits.append(exit_time)
+    return types, entries, exits
+
+def benchmark_pricing(count):
+    # One fee at a time against the whole day in one batch, with numpy when
+    # it is installed; both must give the same fees.
+    engine = PricingEngine(SAMPLE_TARIFFS)
+    types, entries, exits = day_of_exits(count)
+    start = time.perf_counter()
+    one_by_one = [engine.fee(*stay) for stay in zip(types,entries,exits)]
+    single_per_sec = count / (time.perf_counter() - start)
+    start = time.perf_counter()
+    batch = engine.price_many(types,entries,exits)
+    batch_per_sec = count / (time.perf_counter() - start)
+    return single_per_sec, batch_per_sec, batch == one_by_one
+
+def main(sizes):
+    print(f"{'spots':>10} {'scan finds/s':>13} {'pool finds/s':>13} {'same spot':>10} {'rush parks/s':>13}")
+    for size in sizes:
+        r = benchmark_spot_search(size)
+        # rush_hour also releases, so freed spots move the pool's cursor back.
+        print(f"{r['spots']:>10,} {r['scan_per_sec']:>13,.0f} {r['pool_per_sec']:>13,.0f} "
+              f"{str(r['scan_spot'] == r['pool_spot']):>10} {rush_hour(ParkingLot(size),min(size * 6,60_000)):>13,.0f}")
+
+    print(f"\n{'spots':>10} {'report us':>10} {'recount us':>11} {'consistent':>11}")
+    for size in sizes:
+        report_us, recount_us, consistent = benchmark_report(size)
+        print(f"{size * 3:>10,} {report_us:>10.2f} {recount_us:>11,.0f} {str(consistent):>11}")
+
+    print(f"\n{'issued before':>14} {'tickets kept':>13} {'p50 exit us':>12} {'max exit us':>12}")
+    for history, kept, median_us, max_us in benchmark_exit_latency([0,10_000,100_000,300_000]):
+        print(f"{history:>14,} {kept:>13,} {median_us:>12.1f} {max_us:>12.1f}")
+
+    print(f"\n{'spots':>10} {'level B/spot':>13} {'object B/spot':>14}")
+    for size in (10_000,100_000,1_000_000):
+        flat, per_object = benchmark_spot_memory(size)
+        print(f"{size:>10,} {flat:>13.1f} {per_object:>14.1f}")
+
+    print(f"\n{'garages':>8} {'levels':>7} {'spots':>10} {'routed parks/s':>15} {'consistent':>11}")
+    for garages, levels, spots_per_level in ((1,1,1_000),(4,5,5_000),(10,10,2_000)):
+        capacity, parks_per_sec, consistent = benchmark_coordinator(garages,levels,spots_per_level)
+        print(f"{garages:>8} {levels:>7} {capacity:>10,} {parks_per_sec:>15,.0f} {str(consistent):>11}")
+
+    batch_name = "numpy" if parking_pricing.np is not None else "batch"
+    print(f"\n{'exits':>10} {'fees/s':>12} {batch_name + ' fees/s':>14} {'same fees':>10}")
+    for count in (1_000,100_000,1_000_000):
+        single_per_sec, batch_per_sec, same = benchmark_pricing(count)
+        print(f"{count:>10,} {single_per_sec:>12,.0f} {batch_per_sec:>14,.0f} {str(same):>10}")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 10_000, 100_000]
+    main(sizes)
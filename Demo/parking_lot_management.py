@@ -1,5 +1,14 @@
+import json
+import math
+import sys
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import ChainMap
 from datetime import datetime
+from types import MappingProxyType
+from id_generator import new_id
+from parking_pricing import PricingEngine, load_tariffs, shared_engine
 
 class Vehicle(ABC):
     def __init__(self,license_plate,vehicle_type):
@@ -32,138 +41,319 @@ class Truck(Vehicle):
     def get_parking_rate(self):
         return 2.0
 
-class ParkingSpot:
-    def __init__(self,spot_id,vehicle_type):
-        self.spot_id = spot_id 
+VEHICLE_TYPES = ("bike","car","truck")
+SPOT_LETTERS = {"bike": "B", "car": "C", "truck": "T"}
+LETTER_TYPES = {letter: vehicle_type for vehicle_type, letter in SPOT_LETTERS.items()}
+
+class FreeSpotPool:
+    # The free spots of one vehicle type on one level. A level stores each
+    # type's spots as one contiguous index range sorted by distance from the
+    # entrance, so the nearest free spot is the first free status byte in the
+    # range. cursor is a lower bound on it: every spot before it is taken.
+    def __init__(self,level,vehicle_type,lo,hi):
+        self.level = level
         self.vehicle_type = vehicle_type
-        self.is_available = True
-        self.current_vehicle = None
+        self.lo = lo
+        self.hi = hi
+        self.cursor = lo
+        self.total = hi - lo
+        self.available = hi - lo
+
+    def taken(self,index):
+        self.available -= 1
+
+    def freed(self,index):
+        self.available += 1
+        if index < self.cursor:
+            self.cursor = index
+
+    def nearest(self):
+        if not self.available:
+            return None
+        index = self.level.status.find(0,self.cursor,self.hi)
+        self.cursor = index
+        return index
+
+    def __len__(self):
+        return self.available
+
+class Level:
+    # All spots of one floor in flat arrays instead of one object per spot:
+    # a type code, distance and zone per spot, and a status map with one
+    # byte per spot (0 free, 1 occupied) so bytearray.find scans it in C.
+    # Vehicles are only stored for occupied spots. Spot ids are the level
+    # prefix, the type letter and the spot's rank by distance, e.g. "L2-C15".
+    def __init__(self,name,zones,prefix=None):
+        self.name = name
+        self.prefix = f"{name}-" if prefix is None else prefix
+        self.zone_names = []
+        spots = []
+        for zone in zones:
+            zone_code = len(self.zone_names)
+            self.zone_names.append(zone.get("name",""))
+            distance = zone.get("distance",0)
+            for vehicle_type, count in zone["spots"].items():
+                if vehicle_type not in VEHICLE_TYPES:
+                    raise ValueError(f"Unknown spot type {vehicle_type!r} in level {name!r}, zone {zone.get('name','')!r}; "
+                                     f"expected one of {', '.join(VEHICLE_TYPES)}.")
+                type_code = VEHICLE_TYPES.index(vehicle_type)
+                spots.extend((type_code,distance + i,zone_code) for i in range(1,count + 1))
+        spots.sort()
+        self.types = array("B",(spot[0] for spot in spots))
+        self.distances = array("I",(spot[1] for spot in spots))
+        self.zones = array("B",(spot[2] for spot in spots))
+        self.status = bytearray(len(spots))
+        self.vehicles = {}
+        self.pools = {}
+        lo = 0
+        for type_code, vehicle_type in enumerate(VEHICLE_TYPES):
+            hi = bisect_left(self.types,type_code + 1,lo)
+            if hi > lo:
+                self.pools[vehicle_type] = FreeSpotPool(self,vehicle_type,lo,hi)
+            lo = hi
+
+    def __len__(self):
+        return len(self.status)
+
+    def spot_id(self,index):
+        pool = self.pools[VEHICLE_TYPES[self.types[index]]]
+        return f"{self.prefix}{SPOT_LETTERS[pool.vehicle_type]}{index - pool.lo + 1}"
+
+    def find_index(self,local_id):
+        pool = self.pools.get(LETTER_TYPES.get(local_id[:1]))
+        rank = local_id[1:]
+        if pool is not None and rank.isdigit() and 1 <= int(rank) <= pool.total:
+            return pool.lo + int(rank) - 1
+        return None
+
+    def assign(self,index,vehicle):
+        vehicle_type = VEHICLE_TYPES[self.types[index]]
+        if self.status[index] or vehicle.vehicle_type != vehicle_type:
+            return False
+        self.status[index] = 1
+        self.vehicles[index] = vehicle
+        vehicle.entry_time = datetime.now()
+        self.pools[vehicle_type].taken(index)
+        return True
+
+    def release(self,index):
+        if not self.status[index]:
+            return None
+        self.status[index] = 0
+        vehicle = self.vehicles.pop(index)
+        self.pools[VEHICLE_TYPES[self.types[index]]].freed(index)
+        return vehicle
+
+class ParkingSpot:
+    # A lightweight view of one spot in its level's arrays, made on demand.
+    __slots__ = ("level","index")
+
+    def __init__(self,level,index):
+        self.level = level
+        self.index = index
+
+    @property
+    def spot_id(self):
+        return self.level.spot_id(self.index)
+
+    @property
+    def vehicle_type(self):
+        return VEHICLE_TYPES[self.level.types[self.index]]
+
+    @property
+    def distance(self):
+        return self.level.distances[self.index]
+
+    @property
+    def zone(self):
+        return self.level.zone_names[self.level.zones[self.index]]
+
+    @property
+    def is_available(self):
+        return not self.level.status[self.index]
+
+    @property
+    def current_vehicle(self):
+        return self.level.vehicles.get(self.index)
 
     def assign_vehicle(self,vehicle):
-        if self.is_available and vehicle.vehicle_type == self.vehicle_type:
-            self.current_vehicle = vehicle
-            self.is_available = False
-            vehicle.entry_time = datetime.now()
-            return True
-        return False
+        return self.level.assign(self.index,vehicle)
 
     def remove_vehicle(self):
-        if not self.is_available and self.current_vehicle:
-            vehicle =self.current_vehicle
-            self.current_vehicle = None
-            self.is_available = True
-            return vehicle
-        return None
+        return self.level.release(self.index)
     
     def __str__(self):
         status = "Availbale" if self.is_available else f"Occupied by {self.current_vehicle.license_plate}"
         return f"Spot {self.spot_id} ({self.vehicle_type}): {status}"
 
+class SpotDirectory:
+    # Read-only mapping of spot id to ParkingSpot over a lot's levels.
+    def __init__(self,levels):
+        self.levels = levels
+        self.by_prefix = {}
+        # Spot ids are resolved by level prefix, so two levels sharing a name
+        # would hand out the same ids.
+        for level in levels:
+            if level.prefix in self.by_prefix:
+                raise ValueError(f"Duplicate level name {level.name!r}.")
+            self.by_prefix[level.prefix] = level
+
+    def get(self,spot_id,default=None):
+        prefix, dash, local_id = spot_id.rpartition("-")
+        level = self.by_prefix.get(prefix + dash)
+        index = level.find_index(local_id) if level else None
+        return default if index is None else ParkingSpot(level,index)
+
+    def __getitem__(self,spot_id):
+        spot = self.get(spot_id)
+        if spot is None:
+            raise KeyError(spot_id)
+        return spot
+
+    def __contains__(self,spot_id):
+        return self.get(spot_id) is not None
+
+    def values(self):
+        return (ParkingSpot(level,index) for level in self.levels for index in range(len(level)))
+
+    def __iter__(self):
+        return (spot.spot_id for spot in self.values())
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels)
+
 class ParkingLot:
-    def __init__(self):
-        self.spots = {}
-        self.tickets = {}
+    def __init__(self,spots_per_type=10,levels=None,name="Main",pricing=None):
+        self.name = name
+        self.pricing = pricing or shared_engine
+        # Without a layout: one level, spots_per_type of each type, ids B1, C1, T1...
+        if levels is None:
+            levels = [Level("",[{"spots": {vehicle_type: spots_per_type for vehicle_type in VEHICLE_TYPES}}],"")]
+        self.levels = levels
+        self.spots = SpotDirectory(self.levels)
+        # Open tickets by id and by plate; closed tickets move to the archive,
+        # so exits and active listings never touch the history. tickets is a
+        # read-only view over both for lookups by id; writes raise TypeError.
+        self.active_tickets = {}
+        self.active_by_plate = {}
+        self.archived_tickets = {}
+        self.tickets = MappingProxyType(ChainMap(self.active_tickets,self.archived_tickets))
         self.earnings = 0.0
-        self.__initialize_spots()
-
-    def __initialize_spots(self):
-        for i in range(1,11):
-            self.spots[f"B{i}"] = ParkingSpot(f"B{i}", "bike")
-            self.spots[f"C{i}"] = ParkingSpot(f"C{i}", "car")
-            self.spots[f"T{i}"] = ParkingSpot(f"T{i}", "truck")
-    
 
+    # Lower levels fill first; within a level, the spot nearest the entrance.
     def find_available_spot(self,vehicle_type):
-        for spot in self.spots.values():
-            if spot.vehicle_type == vehicle_type and spot.is_available:
-                return spot 
+        for level in self.levels:
+            pool = level.pools.get(vehicle_type)
+            if pool and pool.available:
+                return ParkingSpot(level,pool.nearest())
         return None
 
+    def available(self,vehicle_type):
+        return sum(len(level.pools[vehicle_type]) for level in self.levels if vehicle_type in level.pools)
+
+    def is_parked(self,license_plate):
+        return license_plate in self.active_by_plate
+
     def park_vehicle(self,vehicle):
+        if vehicle.license_plate in self.active_by_plate:
+            return None
         spot = self.find_available_spot(vehicle.vehicle_type)
         if spot and spot.assign_vehicle(vehicle):
-            ticket_id = f"TKT -{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            ticket_id = new_id("TKT -")
             ticket = Ticket(ticket_id,vehicle,spot.spot_id)
-            self.tickets[ticket_id] = ticket
+            ticket.lot_name = self.name
+            self.active_tickets[ticket_id] = ticket
+            self.active_by_plate[vehicle.license_plate] = ticket
             return ticket
         return None
 
     def release_vehicle(self,license_plate):
-        ticket = None
-        for t in self.tickets.values():
-            if t.vehicle.license_plate == license_plate and t.exit_time is None:
-                ticket = t
-                break
-
+        ticket = self.active_by_plate.get(license_plate)
         if ticket:
             spot = self.spots.get(ticket.spot_id)
             if spot and not spot.is_available:
                 vehicle = spot.remove_vehicle()
                 if vehicle:
                     ticket.exit_time = datetime.now()
-                    ticket.fee = ticket.calculate_fee()
+                    ticket.fee = ticket.calculate_fee(self.pricing)
                     self.earnings += ticket.fee
+                    del self.active_by_plate[license_plate]
+                    del self.active_tickets[ticket.ticket_id]
+                    self.archived_tickets[ticket.ticket_id] = ticket
                     return ticket
         return None
 
+    # Built from the free-spot pools' counters and the active-ticket index,
+    # which park and release keep current, so polling it costs nothing.
     def generate_report(self):
-        available_spots = {
-            "bike": sum(1 for s in self.spots.values() if s.vehicle_type == "bike" and s.is_available),
-            "car": sum(1 for s in self.spots.values() if s.vehicle_type == "car" and s.is_available),
-            "truck": sum(1 for s in self.spots.values() if s.vehicle_type == "truck" and s.is_available)
-        }
+        available_spots = {vehicle_type: 0 for vehicle_type in VEHICLE_TYPES}
+        occupied_spots = dict(available_spots)
+        for level in self.levels:
+            for vehicle_type, pool in level.pools.items():
+                available_spots[vehicle_type] += pool.available
+                occupied_spots[vehicle_type] += pool.total - pool.available
         
-        occupied_spots = {
-            "bike": sum(1 for s in self.spots.values() if s.vehicle_type == "bike" and not s.is_available),
-            "car": sum(1 for s in self.spots.values() if s.vehicle_type == "car" and not s.is_available),
-            "truck": sum(1 for s in self.spots.values() if s.vehicle_type == "truck" and not s.is_available)
+        return {
+            "available_spots": available_spots,
+            "occupied_spots": occupied_spots,
+            "total_earnings": self.earnings,
+            "active_tickets": len(self.active_tickets)
         }
-        
-        active_tickets = sum(1 for t in self.tickets.values() if t.exit_time is None)
-        
+
+    def recount(self):
+        available_spots = {vehicle_type: 0 for vehicle_type in VEHICLE_TYPES}
+        occupied_spots = dict(available_spots)
+        for spot in self.spots.values():
+            (available_spots if spot.is_available else occupied_spots)[spot.vehicle_type] += 1
         return {
             "available_spots": available_spots,
             "occupied_spots": occupied_spots,
             "total_earnings": self.earnings,
-            "active_tickets": active_tickets
+            "active_tickets": sum(1 for t in self.tickets.values() if t.exit_time is None)
         }
+
+    # Full recount to compare the counters against; too slow to poll, meant
+    # for an occasional audit.
+    def verify_counters(self):
+        report = self.generate_report()
+        actual = self.recount()
+        mismatches = []
+        for key in ("available_spots","occupied_spots"):
+            for vehicle_type in actual[key]:
+                if report[key].get(vehicle_type) != actual[key][vehicle_type]:
+                    mismatches.append(f"{key} {vehicle_type}: counted {report[key].get(vehicle_type)}, "
+                                      f"actual {actual[key][vehicle_type]}")
+        if report["active_tickets"] != actual["active_tickets"]:
+            mismatches.append(f"active tickets: counted {report['active_tickets']}, actual {actual['active_tickets']}")
+        if mismatches:
+            return False, "; ".join(mismatches)
+        return True, "Counters match a full recount."
+    
+    # Re-prices every ticket closed on day in one batch and compares the result
+    # with the fees charged at exit, e.g. for the daily close.
+    def reconcile(self,day):
+        tickets = [ticket for ticket in self.archived_tickets.values() if ticket.exit_time.date() == day]
+        fees = self.pricing.price_tickets(tickets)
+        mismatches = [f"{ticket.ticket_id}: charged ${ticket.fee:.2f}, priced ${fee:.2f}"
+                      for ticket, fee in zip(tickets,fees) if abs(ticket.fee - fee) >= 0.005]
+        if mismatches:
+            return False, f"{len(mismatches)} of {len(tickets)} fees differ: " + "; ".join(mismatches[:5])
+        return True, f"{len(tickets)} tickets, ${sum(fees):.2f} charged, all fees match."
     
     def get_lot_status(self):
         return [str(spot) for spot in self.spots.values()]
     
     def get_active_tickets(self):
-        return [t for t in self.tickets.values() if t.exit_time is None]
-
-class FeeStrategy(ABC):
-    @abstractmethod
-    def calculate_fee(self, hours):
-        pass
-
-class BikeFeeStrategy(FeeStrategy):
-    def calculate_fee(self, hours):
-        return round(hours * 0.5, 2)  
-    
-class CarFeeStrategy(FeeStrategy):
-    def calculate_fee(self, hours):
-        return round(hours * 1.0, 2)
-
-class TruckFeeStrategy(FeeStrategy):
-    def calculate_fee(self, hours):
-        return round(hours * 2.0, 2)  
+        return list(self.active_tickets.values())
 
 class FeeCalculator:
-    def __init__(self):
-        self.strategies = {
-            "bike": BikeFeeStrategy(),
-            "car": CarFeeStrategy(),
-            "truck": TruckFeeStrategy()
-        }
+    # Prices by duration alone, as if the stay began at midnight. Tickets
+    # price through the lot's PricingEngine, which also knows the entry time.
+    def __init__(self,engine=None):
+        self.engine = engine or shared_engine
     
     def calculate(self, vehicle_type, hours):
-        strategy = self.strategies.get(vehicle_type)
-        if strategy:
-            return strategy.calculate_fee(hours)
-        return 0.0
+        return self.engine.fee_for_minutes(vehicle_type,math.ceil(hours * 60))
 
 class Ticket:
     def __init__(self, ticket_id, vehicle, spot_id):
@@ -173,17 +363,104 @@ class Ticket:
         self.entry_time = datetime.now()
         self.exit_time = None
         self.fee = None
-        self.fee_calculator = FeeCalculator()
+        self.lot_name = None
     
-    def calculate_fee(self):
+    def calculate_fee(self,pricing=None):
         if self.exit_time is None:
             self.exit_time = datetime.now()
         
-        hours_parked = (self.exit_time - self.entry_time).total_seconds() / 3600
-        return self.fee_calculator.calculate(self.vehicle.vehicle_type, hours_parked)
+        return (pricing or shared_engine).fee(self.vehicle.vehicle_type,self.entry_time,self.exit_time)
 
-def parking_lot_menu():
-    parking_lot = ParkingLot()
+def load_layout(filename,pricing=None):
+    # A JSON layout of garages, their levels (filled in listed order) and
+    # each level's zones, e.g.
+    # {"garages": [{"name": "North", "levels": [{"name": "L1", "zones": [
+    #     {"name": "A", "distance": 0, "spots": {"car": 400, "bike": 50}}]}]}]}
+    # A zone's spots count up from its distance, so a far zone gets a larger one.
+    with open(filename) as f:
+        config = json.load(f)
+    names = [garage["name"] for garage in config["garages"]]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate garage name {', '.join(map(repr,duplicates))} in {filename}.")
+    return [ParkingLot(levels=[Level(level["name"],level["zones"]) for level in garage["levels"]],name=garage["name"],
+                       pricing=pricing)
+            for garage in config["garages"]]
+
+class GarageCoordinator:
+    # Several lots behind one entrance. An arriving vehicle goes to the
+    # preferred lot if it has room for its type, otherwise to the first lot in
+    # layout order that does; each lot then picks its lowest level with room.
+    # Exits are routed by plate. Offers the same calls as a single ParkingLot.
+    def __init__(self,lots):
+        self.lots = lots
+        self.by_name = {}
+        for lot in lots:
+            if lot.name in self.by_name:
+                raise ValueError(f"Duplicate garage name {lot.name!r}.")
+            self.by_name[lot.name] = lot
+        self.lot_by_plate = {}
+
+    def is_parked(self,license_plate):
+        return license_plate in self.lot_by_plate
+
+    def park_vehicle(self,vehicle,preferred=None):
+        if vehicle.license_plate in self.lot_by_plate:
+            return None
+        lots = self.lots
+        if preferred in self.by_name:
+            lots = [self.by_name[preferred]] + [lot for lot in self.lots if lot.name != preferred]
+        for lot in lots:
+            if lot.available(vehicle.vehicle_type):
+                ticket = lot.park_vehicle(vehicle)
+                if ticket:
+                    self.lot_by_plate[vehicle.license_plate] = lot
+                    return ticket
+        return None
+
+    def release_vehicle(self,license_plate):
+        lot = self.lot_by_plate.get(license_plate)
+        ticket = lot.release_vehicle(license_plate) if lot else None
+        if ticket:
+            del self.lot_by_plate[license_plate]
+        return ticket
+
+    def generate_report(self):
+        reports = {lot.name: lot.generate_report() for lot in self.lots}
+        report = {
+            "available_spots": {vehicle_type: 0 for vehicle_type in VEHICLE_TYPES},
+            "occupied_spots": {vehicle_type: 0 for vehicle_type in VEHICLE_TYPES},
+            "total_earnings": 0.0,
+            "active_tickets": 0,
+            "lots": reports
+        }
+        for lot_report in reports.values():
+            for key in ("available_spots","occupied_spots"):
+                for vehicle_type, count in lot_report[key].items():
+                    report[key][vehicle_type] += count
+            report["total_earnings"] += lot_report["total_earnings"]
+            report["active_tickets"] += lot_report["active_tickets"]
+        return report
+
+    def verify_counters(self):
+        problems = []
+        for lot in self.lots:
+            consistent, message = lot.verify_counters()
+            if not consistent:
+                problems.append(f"{lot.name}: {message}")
+        if problems:
+            return False, "; ".join(problems)
+        return True, "Counters match a full recount."
+
+    def get_lot_status(self):
+        return [f"{lot.name} {status}" for lot in self.lots for status in lot.get_lot_status()]
+
+    def get_active_tickets(self):
+        return [ticket for lot in self.lots for ticket in lot.get_active_tickets()]
+
+def parking_lot_menu(layout_file=None,tariff_file=None):
+    pricing = PricingEngine(load_tariffs(tariff_file)) if tariff_file else shared_engine
+    parking_lot = GarageCoordinator(load_layout(layout_file,pricing)) if layout_file else ParkingLot(pricing=pricing)
     
     while True:
         print("\nParking Lot Management System")
@@ -198,9 +475,9 @@ def parking_lot_menu():
         
         if choice == '1':
             print("\nVehicle Types:")
-            print("1. Bike ($0.50/hr)")
-            print("2. Car ($1.00/hr)")
-            print("3. Truck ($2.00/hr)")
+            print(f"1. Bike ({pricing.describe('bike')})")
+            print(f"2. Car ({pricing.describe('car')})")
+            print(f"3. Truck ({pricing.describe('truck')})")
             vehicle_choice = input("Select vehicle type: ")
             
             license_plate = input("Enter license plate: ")
@@ -216,11 +493,16 @@ def parking_lot_menu():
                 print("Invalid vehicle type.")
                 continue
             
+            if parking_lot.is_parked(license_plate):
+                print(f"Vehicle {license_plate} is already parked.")
+                continue
             ticket = parking_lot.park_vehicle(vehicle)
             if ticket:
                 print(f"\nVehicle parked successfully!")
                 print(f"Ticket ID: {ticket.ticket_id}")
                 print(f"Spot ID: {ticket.spot_id}")
+                if layout_file:
+                    print(f"Garage: {ticket.lot_name}")
                 print(f"Entry Time: {ticket.entry_time}")
             else:
                 print("No available spots for this vehicle type.")
@@ -269,5 +551,12 @@ def parking_lot_menu():
             print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
-    parking_lot_menu()
+    # python parking_lot_management.py [layout.json] [--tariffs tariffs.json]
+    args = sys.argv[1:]
+    tariff_file = None
+    if "--tariffs" in args:
+        position = args.index("--tariffs")
+        tariff_file = args[position + 1]
+        del args[position:position + 2]
+    parking_lot_menu(args[0] if args else None,tariff_file)
 
@@ -0,0 +1,165 @@
+import json
+import math
+from array import array
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MINUTES_PER_DAY = 24 * 60
+
+# The flat hourly rates the lot has always charged.
+DEFAULT_TARIFFS = {
+    "bike": {"rate": 0.5},
+    "car": {"rate": 1.0},
+    "truck": {"rate": 2.0},
+}
+
+def parse_clock(text):
+    hours, minutes = text.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def billed_minutes(entry_time,exit_time):
+    # Every started minute is charged.
+    seconds = (exit_time - entry_time).total_seconds()
+    return max(0,math.ceil(seconds / 60))
+
+def minute_of_day(moment):
+    return moment.hour * 60 + moment.minute
+
+class Tariff:
+    # One vehicle type's tariff, compiled once into per-minute tables so that
+    # pricing a stay is a couple of lookups plus arithmetic. Config keys:
+    #   "rate": dollars per hour, with optional "peak" windows
+    #       [{"start": "07:00", "end": "10:00", "rate": 3.0}] (may wrap midnight)
+    #   "tiers": [[hours, price], ...] flat price for stays up to each length,
+    #       used instead of "rate"
+    #   "daily_cap": most charged for any 24 hours from entry
+    #   "grace_minutes": stays this short are free
+    def __init__(self,config):
+        self.config = config
+        self.grace = config.get("grace_minutes",0)
+        self.cap = config["daily_cap"] * 100 if "daily_cap" in config else None
+        if "tiers" in config:
+            # by_duration[m]: price in cents of a stay of m minutes, up to a day.
+            tiers = sorted((int(hours * 60),price * 100) for hours, price in config["tiers"])
+            limits = [limit for limit, _ in tiers]
+            self.by_duration = array("d",[0.0] + [tiers[min(bisect_left(limits,m),len(tiers) - 1)][1]
+                                                  for m in range(1,MINUTES_PER_DAY + 1)])
+            self.cumulative = None
+        else:
+            # cumulative[m]: cents charged from midnight up to minute m, over
+            # two days so a stay that crosses midnight is still one subtraction.
+            per_minute = [config["rate"] * 100 / 60] * MINUTES_PER_DAY
+            for peak in config.get("peak",[]):
+                start, end = parse_clock(peak["start"]), parse_clock(peak["end"])
+                minutes = range(start,end) if start < end else list(range(start,MINUTES_PER_DAY)) + list(range(end))
+                for minute in minutes:
+                    per_minute[minute] = peak["rate"] * 100 / 60
+            cumulative = [0.0]
+            for cents in per_minute * 2:
+                cumulative.append(cumulative[-1] + cents)
+            self.cumulative = array("d",cumulative)
+            self.by_duration = None
+        full_day = self.window(0,MINUTES_PER_DAY)
+        self.full_day = full_day if self.cap is None else min(full_day,self.cap)
+
+    def window(self,start,minutes):
+        # Cents for minutes (at most a day) starting at minute-of-day start.
+        if self.by_duration is not None:
+            return self.by_duration[minutes]
+        return self.cumulative[start + minutes] - self.cumulative[start]
+
+    def fee_cents(self,start,minutes):
+        if minutes <= self.grace:
+            return 0
+        days, rest = divmod(minutes,MINUTES_PER_DAY)
+        partial = self.window(start,rest)
+        if self.cap is not None and partial > self.cap:
+            partial = self.cap
+        return round(days * self.full_day + partial)
+
+    def fee_cents_many(self,starts,minutes):
+        # The same as fee_cents over numpy arrays of start minutes and stays.
+        days, rest = np.divmod(minutes,MINUTES_PER_DAY)
+        if self.by_duration is not None:
+            partial = np.frombuffer(self.by_duration,dtype=np.float64)[rest]
+        else:
+            cumulative = np.frombuffer(self.cumulative,dtype=np.float64)
+            partial = cumulative[starts + rest] - cumulative[starts]
+        if self.cap is not None:
+            partial = np.minimum(partial,self.cap)
+        fees = np.round(days * self.full_day + partial).astype(np.int64)
+        fees[minutes <= self.grace] = 0
+        return fees
+
+    def describe(self):
+        if self.by_duration is not None:
+            text = f"from ${self.by_duration[1] / 100:.2f}"
+        else:
+            text = f"${self.config['rate']:.2f}/hr"
+            for peak in self.config.get("peak",[]):
+                text += f", ${peak['rate']:.2f}/hr {peak['start']}-{peak['end']}"
+        if self.cap is not None:
+            text += f", max ${self.cap / 100:.2f}/day"
+        if self.grace:
+            text += f", first {self.grace} min free"
+        return text
+
+class PricingEngine:
+    # Holds the compiled tariffs for every vehicle type. One engine is shared
+    # by all tickets of a lot instead of each ticket building its own.
+    def __init__(self,tariffs=None):
+        self.tariffs = {}
+        self.configure(DEFAULT_TARIFFS if tariffs is None else tariffs)
+
+    def configure(self,tariffs):
+        self.tariffs = {vehicle_type: Tariff(config) for vehicle_type, config in tariffs.items()}
+
+    def describe(self,vehicle_type):
+        tariff = self.tariffs.get(vehicle_type)
+        return tariff.describe() if tariff else "free"
+
+    def fee(self,vehicle_type,entry_time,exit_time):
+        tariff = self.tariffs.get(vehicle_type)
+        if tariff is None:
+            return 0.0
+        return tariff.fee_cents(minute_of_day(entry_time),billed_minutes(entry_time,exit_time)) / 100
+
+    def fee_for_minutes(self,vehicle_type,minutes,start=0):
+        tariff = self.tariffs.get(vehicle_type)
+        return tariff.fee_cents(start,minutes) / 100 if tariff else 0.0
+
+    def price_many(self,vehicle_types,entry_times,exit_times):
+        # Prices a batch of stays at once, e.g. a day's exits for
+        # reconciliation. Returns fees in dollars in input order.
+        if np is None or not vehicle_types:
+            return [self.fee(*stay) for stay in zip(vehicle_types,entry_times,exit_times)]
+        # fromiter over plain numbers is several times faster than having
+        # numpy convert the datetime objects to datetime64 itself.
+        count = len(vehicle_types)
+        starts = np.fromiter((entry.hour * 60 + entry.minute for entry in entry_times),dtype=np.int64,count=count)
+        seconds = np.fromiter(((exit_time - entry).total_seconds() for entry, exit_time in zip(entry_times,exit_times)),
+                              dtype=np.float64,count=count)
+        minutes = np.maximum(0,np.ceil(seconds / 60)).astype(np.int64)
+        types = np.array(vehicle_types)
+        cents = np.zeros(len(types),dtype=np.int64)
+        for vehicle_type, tariff in self.tariffs.items():
+            mask = types == vehicle_type
+            if mask.any():
+                cents[mask] = tariff.fee_cents_many(starts[mask],minutes[mask])
+        return (cents / 100).tolist()
+
+    def price_tickets(self,tickets):
+        return self.price_many([ticket.vehicle.vehicle_type for ticket in tickets],
+                               [ticket.entry_time for ticket in tickets],
+                               [ticket.exit_time for ticket in tickets])
+
+def load_tariffs(filename):
+    # {"car": {"rate": 1.0, "peak": [...], "daily_cap": 20, "grace_minutes": 10}, ...}
+    with open(filename) as f:
+        return json.load(f)
+
+shared_engine = PricingEngine()
@@ -1,6 +1,7 @@
 from datetime import datetime
 from abc import ABC, abstractmethod
 import uuid
+from id_generator import new_id
 
 class User(ABC):
     def __init__(self,user_id,name,email,role):
@@ -63,7 +64,7 @@ class Project:
         if "create_tasks" not in creator.get_permission():
             return None, "Permission denied"
         
-        task_id = f"TASK --{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        task_id = new_id("TASK --")
         task = Task(task_id, title, self.project_id)
         self.tasks[task_id] = task
         return task, "Task created"
@@ -223,7 +224,7 @@ class ProjectManagerSystem:
         if "create_projects" not in creator.get_permission():
             return None, "Permission denied"
         
-        project_id = f"PROJ--{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        project_id = new_id("PROJ--")
         project = Project(project_id, project_data["title"],creator)
         self.projects[project_id] = project
         return project, "Project created"